@@ -0,0 +1,146 @@
+"""Headless micro-benchmarks for Ultimate Zombie Escape.
+
+    python bench.py           # run every benchmark
+    python bench.py aoi       # run selected benchmarks by name
+"""
+import os
+import sys
+import time
+import random
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import game
+
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    def register(fn):
+        BENCHMARKS[name] = fn
+        return fn
+    return register
+
+
+def make_game(seed=0, headless=False):
+    random.seed(seed)
+    zombie_escape = game.ZombieEscape(headless=headless)
+    zombie_escape.begin_playing()
+    zombie_escape.player.health = zombie_escape.player.max_health = 10 ** 9
+    return zombie_escape
+
+
+def per_frame_ms(fn, frames):
+    start = time.perf_counter()
+    for _ in range(frames):
+        fn()
+    return (time.perf_counter() - start) * 1000 / frames
+
+
+def horde(zombie_escape, total, on_screen=0.1, spread=8):
+    # A fraction of the horde inside the view, the rest scattered far outside it
+    zombie_escape.zombies = []
+    view = zombie_escape.camera.rect
+    for i in range(total):
+        if i < total * on_screen:
+            x, y = random.randint(view.left, view.right), random.randint(view.top, view.bottom)
+        else:
+            while True:
+                x = random.randint(view.left - view.width * spread, view.right + view.width * spread)
+                y = random.randint(view.top - view.height * spread, view.bottom + view.height * spread)
+                if not view.inflate(game.AOI_MARGIN * 2, game.AOI_MARGIN * 2).collidepoint(x, y):
+                    break
+        zombie = game.Zombie(x, y, random.choice(game.ZOMBIE_TYPES), zombie_escape.assets)
+        zombie.speed = 0
+        zombie_escape.zombies.append(zombie)
+    zombie_escape.zombie_grid.rebuild(zombie_escape.zombies)
+
+
+@benchmark("aoi")
+def bench_aoi(frames=60):
+    print(f"{'zombies':>8} {'drawn':>6} {'draw ms':>8} {'update ms':>10}")
+    for total in (100, 1000, 5000, 20000):
+        zombie_escape = make_game(headless=True)
+        horde(zombie_escape, total, on_screen=min(0.1, 100 / total))
+        update_ms = per_frame_ms(zombie_escape.update, frames)
+        draw_ms = per_frame_ms(zombie_escape.draw_game, frames)
+        drawn = zombie_escape.render_stats["zombies_drawn"]
+        print(f"{total:>8} {drawn:>6} {draw_ms:>8.2f} {update_ms:>10.2f}")
+
+
+@benchmark("pacing")
+def bench_pacing(seconds=2):
+    # Simulation rate should hold at SIM_RATE whatever the render rate or load
+    print(f"{'mode':>9} {'load ms':>8} {'fps':>6} {'sim Hz':>7}")
+    for mode in ("60", "144", "uncapped", "adaptive"):
+        for load_ms in (0, 25):
+            zombie_escape = make_game()
+            zombie_escape.pacer.set_mode(mode)
+            frames = steps = 0
+            start = time.perf_counter()
+            while time.perf_counter() - start < seconds:
+                zombie_escape.pacer.tick()
+                for _ in zombie_escape.pacer.steps():
+                    zombie_escape.update()
+                    steps += 1
+                zombie_escape.events.drain()
+                zombie_escape.draw()
+                time.sleep(load_ms / 1000)
+                frames += 1
+            elapsed = time.perf_counter() - start
+            print(f"{mode:>9} {load_ms:>8} {frames / elapsed:>6.0f} {steps / elapsed:>7.1f}")
+
+
+@benchmark("pipeline")
+def bench_pipeline(seconds=3):
+    # Uncapped frames and simulation ticks per second, serial loop vs simulation on a worker thread
+    print(f"{'zombies':>8} {'mode':>9} {'fps':>6} {'sim Hz':>7}")
+    for total in (300, 3000):
+        for pipelined in (False, True):
+            zombie_escape = make_game()
+            zombie_escape.pacer.set_mode("uncapped")
+            horde(zombie_escape, total, on_screen=min(1.0, 300 / total))
+            for zombie in zombie_escape.zombies[:100]:
+                zombie_escape.blood_particles.add_particles(zombie.rect.center, game.BLOOD_RED, 20, lifespan=10 ** 6)
+            if pipelined:
+                zombie_escape.start_pipeline()
+            frame = zombie_escape.pipelined_frame if pipelined else zombie_escape.frame
+            frames = 0
+            start_tick = zombie_escape.tick
+            start = time.perf_counter()
+            while time.perf_counter() - start < seconds:
+                frame()
+                frames += 1
+            elapsed = time.perf_counter() - start
+            zombie_escape.stop_pipeline()
+            mode = "pipelined" if pipelined else "serial"
+            print(f"{total:>8} {mode:>9} {frames / elapsed:>6.0f} {(zombie_escape.tick - start_tick) / elapsed:>7.1f}")
+
+
+@benchmark("render-scale")
+def bench_render_scale(frames=60):
+    # World draw cost at each internal render scale, for a busy on-screen horde
+    print(f"{'window':>10} {'scale':>6} {'draw ms':>8}")
+    for size in ((1024, 768), (1920, 1080)):
+        game.open_display(size)
+        for scale in game.RENDER_SCALES:
+            zombie_escape = make_game()
+            zombie_escape.scaler.set_scale(scale)
+            horde(zombie_escape, 400, on_screen=1.0)
+            for zombie in zombie_escape.zombies[:150]:
+                zombie_escape.blood_particles.add_particles(zombie.rect.center, game.BLOOD_RED, 20, lifespan=10 ** 6)
+            draw_ms = per_frame_ms(zombie_escape.draw_game, frames)
+            print(f"{size[0]:>5}x{size[1]:<4} {scale:>6.2f} {draw_ms:>8.2f}")
+    game.open_display((1024, 768))
+
+
+def main(argv):
+    names = argv or list(BENCHMARKS)
+    for name in names:
+        print(f"== {name}")
+        BENCHMARKS[name]()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
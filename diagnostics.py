@@ -0,0 +1,149 @@
+"""Leak diagnostics for Ultimate Zombie Escape.
+
+Tracks live entity counts every frame and, at each round start, takes a
+census of game objects after a full garbage collection plus a tracemalloc
+snapshot. Counts that keep climbing across restarts are flagged. Press F3 in
+game for the overlay and F4 to dump everything as JSON.
+
+    python game.py --diagnostics diagnostics.json
+"""
+import gc
+import json
+import math
+import time
+import tracemalloc
+
+import pygame
+
+# Game classes counted across the whole heap at every round start
+TRACKED_TYPES = ("Player", "Weapon", "Zombie", "Bullet", "Supply", "GameEvent", "Chunk", "InputState")
+GAME_MODULES = ("game", "__main__")
+# Live counters that should stay flat from one round start to the next
+FLAT_COUNTERS = ("subscribers", "chunks_cached")
+GROWTH_ROUNDS = 3
+MEMORY_SLACK = 256 * 1024
+TOP_ALLOCATIONS = 10
+PANEL_STEP = 32
+
+
+def live_counts(game):
+    counts = {
+        "bullets": len(game.bullets),
+        "particles": len(game.particles.particles),
+        "blood_particles": len(game.blood_particles.particles),
+        "pending_events": game.events.count,
+        "subscribers": sum(len(handlers) for handlers in game.events.subscribers),
+        "chunks_cached": len(game.world.cache) if game.world else 0,
+        "surfaces_cached": len(game.surface_cache)
+    }
+    for zombie in game.zombies:
+        key = f"zombies.{zombie.type}"
+        counts[key] = counts.get(key, 0) + 1
+    for supply in game.supplies:
+        key = f"supplies.{supply.type}"
+        counts[key] = counts.get(key, 0) + 1
+    return counts
+
+
+def census():
+    gc.collect()
+    counts = dict.fromkeys(TRACKED_TYPES, 0)
+    for obj in gc.get_objects():
+        cls = type(obj)
+        if cls.__name__ in counts and cls.__module__ in GAME_MODULES:
+            counts[cls.__name__] += 1
+    return counts
+
+
+class Diagnostics:
+    def __init__(self, path=None, frames=1):
+        self.path = path
+        self.visible = False
+        self.rounds = []
+        self.flags = []
+        self.snapshot = None
+        self.started = time.monotonic()
+        self.font = None
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+
+    def take_snapshot(self):
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>")
+        ))
+
+    def round_started(self, game):
+        objects = census()
+        snapshot = self.take_snapshot()
+        traced, peak = tracemalloc.get_traced_memory()
+        top = []
+        if self.snapshot is not None:
+            for stat in snapshot.compare_to(self.snapshot, "lineno")[:TOP_ALLOCATIONS]:
+                if stat.size_diff > 0:
+                    frame = stat.traceback[0]
+                    top.append({"where": f"{frame.filename}:{frame.lineno}",
+                                "size_diff": stat.size_diff, "count_diff": stat.count_diff})
+        self.snapshot = snapshot
+        self.rounds.append({
+            "round": len(self.rounds) + 1,
+            "uptime_seconds": round(time.monotonic() - self.started, 1),
+            "objects": objects,
+            "live": live_counts(game),
+            "traced_bytes": traced,
+            "peak_bytes": peak,
+            "top_growth": top
+        })
+        self.flags = self.growth_flags()
+        if self.path:
+            self.dump(self.path, game)
+
+    def growth_flags(self):
+        # Flag anything that grew at every one of the last GROWTH_ROUNDS restarts
+        recent = self.rounds[-(GROWTH_ROUNDS + 1):]
+        if len(recent) <= GROWTH_ROUNDS:
+            return []
+        series = {name: [r["objects"][name] for r in recent] for name in TRACKED_TYPES}
+        for name in FLAT_COUNTERS:
+            series[name] = [r["live"][name] for r in recent]
+        flags = [f"{name} grew every restart: {counts[0]} -> {counts[-1]}"
+                 for name, counts in series.items()
+                 if all(b > a for a, b in zip(counts, counts[1:]))]
+        traced = [r["traced_bytes"] for r in recent]
+        if all(b - a > MEMORY_SLACK for a, b in zip(traced, traced[1:])):
+            flags.append(f"traced memory grew every restart: "
+                         f"{traced[0] / 2 ** 20:.1f} -> {traced[-1] / 2 ** 20:.1f} MB")
+        return flags
+
+    def report(self, game):
+        traced, peak = tracemalloc.get_traced_memory()
+        return {
+            "uptime_seconds": round(time.monotonic() - self.started, 1),
+            "rounds": len(self.rounds),
+            "live": live_counts(game),
+            "traced_bytes": traced,
+            "peak_bytes": peak,
+            "flags": self.flags,
+            "history": self.rounds
+        }
+
+    def dump(self, path, game):
+        with open(path, "w") as out:
+            json.dump(self.report(game), out, indent=2)
+
+    def draw(self, surface, game):
+        if self.font is None:
+            self.font = pygame.font.Font(None, 22)
+        traced, peak = tracemalloc.get_traced_memory()
+        rows = [(f"{name}: {count}", (255, 255, 255)) for name, count in sorted(live_counts(game).items())]
+        rows.append((f"traced: {traced / 2 ** 20:.1f} MB (peak {peak / 2 ** 20:.1f})", (255, 255, 255)))
+        rows.append((f"rounds: {len(self.rounds)}", (255, 255, 255)))
+        rows.extend((flag, (255, 80, 80)) for flag in self.flags)
+        # Panel and row surfaces come from the game's caches so the overlay adds no per-frame allocations;
+        # the width is rounded up so the cached panel only changes size in steps
+        texts = [game.surface_cache.text(self.font, text, color) for text, color in rows]
+        width = math.ceil((max(text.get_width() for text in texts) + 16) / PANEL_STEP) * PANEL_STEP
+        x = surface.get_width() - width - 10
+        surface.blit(game.surface_cache.fill((width, len(rows) * 18 + 12), (0, 0, 0, 170)), (x, 100))
+        for i, text in enumerate(texts):
+            surface.blit(text, (x + 8, 106 + i * 18))
@@ -3,6 +3,10 @@ import random
 import sys
 import math
 import os
+import time
+import argparse
+import threading
+from collections import OrderedDict
 from pygame import gfxdraw
 from pygame.locals import *
 
@@ -10,10 +14,53 @@ from pygame.locals import *
 pygame.init()
 pygame.mixer.init()
 
-# Screen setup
+# Screen setup: the window is opened on first use, at any resolution
 WIDTH, HEIGHT = 1024, 768
-win = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("🧟 ULTIMATE ZOMBIE ESCAPE 💀")
+win = None
+# World pixels visible top to bottom, whatever the window size
+VIEW_HEIGHT = 768
+# Steps the adaptive render scale moves through under load
+RENDER_SCALES = [1.0, 0.85, 0.7, 0.5]
+
+# Frame pacing: the simulation always advances in fixed 1/60 s steps
+SIM_RATE = 60
+MAX_SIM_STEPS = 5
+INVINCIBLE_TICKS = 60
+SPEED_BOOST_TICKS = 300
+PACING_MODES = ["uncapped", "60", "120", "144", "adaptive"]
+ADAPTIVE_RATES = [144, 120, 60, 30]
+
+# World setup: a chunked map many screens wide, built lazily around the camera
+CHUNK_SIZE = 500
+WORLD_CHUNKS = 16
+WORLD_WIDTH = WORLD_HEIGHT = CHUNK_SIZE * WORLD_CHUNKS
+CHUNK_CACHE_SIZE = 20
+CHUNK_UNLOAD_DISTANCE = 3
+# Background tile size in world pixels, so every resolution draws the same map
+BACKGROUND_SIZE = (VIEW_HEIGHT * 4 // 3, VIEW_HEIGHT)
+BULLET_LIFETIME = 90
+
+# Area of interest: entities further than this outside the view update less often
+AOI_MARGIN = 200
+FAR_UPDATE_INTERVAL = 4
+
+# Gameplay events, published by the simulation and drained once per frame
+ZOMBIE_HIT = 0
+ZOMBIE_KILLED = 1
+PLAYER_HIT = 2
+PLAYER_DIED = 3
+PLAYER_DASHED = 4
+SUPPLY_COLLECTED = 5
+WEAPON_FIRED = 6
+WEAPON_RELOADED = 7
+WEAPON_SWITCHED = 8
+ROUND_WON = 9
+ROUND_STARTED = 10
+GAME_PAUSED = 11
+GAME_RESUMED = 12
+SUPPLY_SPAWNED = 13
+EVENT_KINDS = 14
+MAX_PENDING_EVENTS = 4096
 
 # Game states
 MENU = 0
@@ -41,6 +88,29 @@ NEON_BLUE = (0, 200, 255)
 NEON_GREEN = (57, 255, 20)
 
 # Load assets
+def open_display(size=None, vsync=False):
+    global win, WIDTH, HEIGHT
+    size = size or (WIDTH, HEIGHT)
+    if vsync:
+        win = pygame.display.set_mode(size, pygame.SCALED, vsync=1)
+    else:
+        win = pygame.display.set_mode(size)
+    WIDTH, HEIGHT = win.get_size()
+    pygame.display.set_caption("🧟 ULTIMATE ZOMBIE ESCAPE 💀")
+    return win
+
+def ensure_display():
+    return win if win is not None else open_display()
+
+def view_size():
+    return round(VIEW_HEIGHT * WIDTH / HEIGHT), VIEW_HEIGHT
+
+def chunk_budget(view):
+    # Cache every chunk a view can straddle plus some slack, and never unload one still on screen
+    visible = (math.ceil(view[0] / CHUNK_SIZE) + 1) * (math.ceil(view[1] / CHUNK_SIZE) + 1)
+    reach = math.ceil(max(view) / 2 / CHUNK_SIZE) + 1
+    return max(CHUNK_CACHE_SIZE, visible + 8), max(CHUNK_UNLOAD_DISTANCE, reach)
+
 def load_image(name, scale=1, colorkey=None):
     try:
         image = pygame.image.load(f"assets/{name}.png").convert_alpha()
@@ -69,11 +139,14 @@ def load_sound(name):
         return pygame.mixer.Sound(buffer=bytearray(1000))
 
 def load_assets():
+    # Images are converted to the display format, so a window has to exist first
+    ensure_display()
     assets = {
         "player": load_image("player", 0.5),
         "zombie_normal": load_image("zombie1", 0.4),
         "zombie_fast": load_image("zombie2", 0.35),
         "zombie_tank": load_image("zombie3", 0.5),
+        "zombie_boss": load_image("zombie3", 0.9),
         "bullet": load_image("bullet", 0.2),
         "health_pack": load_image("health", 0.3),
         "ammo_pack": load_image("ammo", 0.3),
@@ -98,12 +171,12 @@ def load_assets():
     }
     
     if assets["background"]:
-        assets["background"] = pygame.transform.scale(assets["background"], (WIDTH, HEIGHT))
-        darken = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
+        assets["background"] = pygame.transform.scale(assets["background"], BACKGROUND_SIZE)
+        darken = pygame.Surface(BACKGROUND_SIZE, pygame.SRCALPHA)
         darken.fill((0, 0, 0, 128))
         assets["background"].blit(darken, (0, 0))
     else:
-        assets["background"] = pygame.Surface((WIDTH, HEIGHT))
+        assets["background"] = pygame.Surface(BACKGROUND_SIZE)
         assets["background"].fill(DARK_GRAY)
     
     return assets
@@ -133,13 +206,193 @@ class ParticleSystem:
             if particle['life'] <= 0:
                 self.particles.remove(particle)
     
-    def draw(self, surface):
+    def visible(self, view):
+        # Plain tuples, so a snapshot never shares mutable particle state
+        visible = []
         for particle in self.particles:
-            alpha = int(255 * (particle['life'] / particle['max_life']))
-            color = (*particle['color'][:3], alpha)
-            size = particle['size']
             pos = (int(particle['pos'][0]), int(particle['pos'][1]))
-            pygame.gfxdraw.filled_circle(surface, pos[0], pos[1], size, color)
+            if view.collidepoint(pos):
+                alpha = int(255 * (particle['life'] / particle['max_life']))
+                visible.append((pos[0], pos[1], (*particle['color'][:3], alpha), particle['size']))
+        return visible
+    
+    def draw(self, surface, view, zoom=1):
+        return draw_particles(surface, self.visible(view), view.topleft, zoom)
+
+def draw_particles(surface, particles, offset, zoom=1):
+    for x, y, color, size in particles:
+        pygame.gfxdraw.filled_circle(surface, int((x - offset[0]) * zoom), int((y - offset[1]) * zoom),
+                                     max(1, int(size * zoom)), color)
+    return len(particles)
+
+class SurfaceCache:
+    def __init__(self, text_capacity=256, alpha_step=16):
+        self.surfaces = {}
+        self.texts = OrderedDict()
+        self.text_capacity = text_capacity
+        self.alpha_step = alpha_step
+    
+    def __len__(self):
+        return len(self.surfaces) + len(self.texts)
+    
+    def quantize(self, color):
+        # Snap alpha so pulsing effects reuse a handful of surfaces
+        if len(color) < 4:
+            return tuple(color)
+        return (*color[:3], min(255, round(color[3] / self.alpha_step) * self.alpha_step))
+    
+    def fill(self, size, color):
+        key = ("fill", size, self.quantize(color))
+        surface = self.surfaces.get(key)
+        if surface is None:
+            surface = pygame.Surface(size, pygame.SRCALPHA)
+            surface.fill(key[2])
+            self.surfaces[key] = surface
+        return surface
+    
+    def outline(self, size, color, width=1):
+        key = ("outline", size, self.quantize(color), width)
+        surface = self.surfaces.get(key)
+        if surface is None:
+            surface = pygame.Surface(size, pygame.SRCALPHA)
+            pygame.draw.rect(surface, key[2], (0, 0, *size), width)
+            self.surfaces[key] = surface
+        return surface
+    
+    def scaled(self, image, zoom):
+        if zoom == 1:
+            return image
+        key = ("scaled", image, zoom)
+        surface = self.surfaces.get(key)
+        if surface is None:
+            width, height = image.get_size()
+            surface = pygame.transform.scale(image, (max(1, round(width * zoom)), max(1, round(height * zoom))))
+            self.surfaces[key] = surface
+        return surface
+    
+    def text(self, font, text, color):
+        # HUD strings change every few frames, so text lives in a small LRU
+        key = (font, text, tuple(color))
+        surface = self.texts.get(key)
+        if surface is None:
+            surface = font.render(text, True, color)
+            self.texts[key] = surface
+            if len(self.texts) > self.text_capacity:
+                self.texts.popitem(last=False)
+        else:
+            self.texts.move_to_end(key)
+        return surface
+    
+    def clear(self):
+        self.surfaces.clear()
+        self.texts.clear()
+
+class GameEvent:
+    __slots__ = ("kind", "tick", "x", "y", "value", "data")
+    
+    def __init__(self):
+        self.kind = 0
+        self.tick = 0
+        self.x = 0
+        self.y = 0
+        self.value = 0
+        self.data = None
+
+class EventBus:
+    def __init__(self, capacity=256):
+        self.buffer = [GameEvent() for _ in range(capacity)]
+        self.count = 0
+        self.dropped = 0
+        self.tick = 0
+        self.subscribers = [[] for _ in range(EVENT_KINDS)]
+    
+    def subscribe(self, kind, handler):
+        self.subscribers[kind].append(handler)
+    
+    def unsubscribe(self, kind, handler):
+        self.subscribers[kind].remove(handler)
+    
+    def emit(self, kind, x=0, y=0, value=0, data=None):
+        # Nobody listening (e.g. headless runs): skip the event entirely
+        if not self.subscribers[kind]:
+            return
+        if self.count == len(self.buffer):
+            if self.count >= MAX_PENDING_EVENTS:
+                self.dropped += 1
+                return
+            self.buffer.extend(GameEvent() for _ in range(self.count))
+        event = self.buffer[self.count]
+        event.kind = kind
+        event.tick = self.tick
+        event.x = x
+        event.y = y
+        event.value = value
+        event.data = data
+        self.count += 1
+    
+    def drain(self):
+        buffer = self.buffer
+        subscribers = self.subscribers
+        for i in range(self.count):
+            event = buffer[i]
+            for handler in subscribers[event.kind]:
+                handler(event)
+            event.data = None
+        self.count = 0
+
+class AudioEffects:
+    SOUNDS = {
+        ZOMBIE_KILLED: "zombie_death",
+        PLAYER_HIT: "hit",
+        PLAYER_DIED: "game_over",
+        PLAYER_DASHED: "dash",
+        SUPPLY_COLLECTED: "collect",
+        WEAPON_FIRED: "shoot",
+        WEAPON_RELOADED: "reload",
+        WEAPON_SWITCHED: "weapon_switch",
+        ROUND_WON: "victory"
+    }
+    
+    def __init__(self, sounds):
+        self.sounds = sounds
+    
+    def attach(self, events):
+        for kind, name in self.SOUNDS.items():
+            events.subscribe(kind, lambda event, sound=self.sounds[name]: sound.play())
+
+class VisualEffects:
+    def __init__(self, particles, blood_particles):
+        self.particles = particles
+        self.blood_particles = blood_particles
+    
+    def attach(self, events):
+        events.subscribe(ZOMBIE_HIT, self.on_zombie_hit)
+        events.subscribe(ZOMBIE_KILLED, self.on_zombie_killed)
+        events.subscribe(PLAYER_HIT, self.on_player_hit)
+        events.subscribe(SUPPLY_COLLECTED, self.on_supply_collected)
+        events.subscribe(WEAPON_FIRED, self.on_weapon_fired)
+    
+    def on_zombie_hit(self, event):
+        self.blood_particles.add_particles(
+            (event.x, event.y), 
+            BLOOD_RED, 
+            20, 
+            2, 
+            30,
+            size_range=(3, 6) if event.data == "tank" else (2, 5)
+        )
+    
+    def on_zombie_killed(self, event):
+        self.particles.add_particles((event.x, event.y), GREEN, 30, 3, 40)
+    
+    def on_player_hit(self, event):
+        self.blood_particles.add_particles((event.x, event.y), BLOOD_RED, 30, 3, 40)
+    
+    def on_supply_collected(self, event):
+        self.particles.add_particles((event.x, event.y), event.data.image.get_at((15, 15))[:3], 20, 2, 30)
+    
+    def on_weapon_fired(self, event):
+        self.particles.add_particles((event.x, event.y), (255, 255, 200), 15, 3, 15)
 
 class Weapon:
     def __init__(self, name, damage, fire_rate, ammo, reload_time, spread, bullet_speed, color):
@@ -179,6 +432,8 @@ class Weapon:
             self.fire_timer -= 1
         if self.reload_timer > 0:
             self.reload_timer -= 1
+            if self.reload_timer <= 0:
+                self.finish_reload()
     
     def reload(self):
         if self.reload_timer <= 0 and self.ammo < self.max_ammo:
@@ -192,7 +447,8 @@ class Weapon:
 class Player:
     def __init__(self, assets):
         self.image = assets["player"]
-        self.rect = self.image.get_rect(center=(WIDTH//2, HEIGHT//2))
+        self.rect = self.image.get_rect(center=(WORLD_WIDTH//2, WORLD_HEIGHT//2))
+        self.prev_pos = self.rect.topleft
         self.speed = 5
         self.base_speed = 5
         self.health = 100
@@ -203,6 +459,7 @@ class Player:
         self.dashing = False
         self.dash_direction = [0, 0]
         self.dash_timer = 0
+        self.speed_boost_timer = 0
         self.score = 0
         self.kills = 0
         self.weapons = [
@@ -239,11 +496,18 @@ class Player:
             if self.dash_timer <= 0:
                 self.dashing = False
         
-        self.rect.x = max(0, min(WIDTH - self.rect.width, self.rect.x))
-        self.rect.y = max(0, min(HEIGHT - self.rect.height, self.rect.y))
+        self.rect.x = max(0, min(WORLD_WIDTH - self.rect.width, self.rect.x))
+        self.rect.y = max(0, min(WORLD_HEIGHT - self.rect.height, self.rect.y))
+        
+        if self.invincible:
+            self.invincible_timer -= 1
+            if self.invincible_timer <= 0:
+                self.invincible = False
         
-        if self.invincible and pygame.time.get_ticks() - self.invincible_timer > 1000:
-            self.invincible = False
+        if self.speed_boost_timer > 0:
+            self.speed_boost_timer -= 1
+            if self.speed_boost_timer <= 0:
+                self.speed = self.base_speed
         
         for weapon in self.weapons:
             weapon.update()
@@ -267,6 +531,13 @@ class Zombie:
             self.damage = 25
             self.knockback_resistance = 0.95
             self.score_value = 250
+        elif zombie_type == "boss":
+            self.image = assets["zombie_boss"]
+            self.speed = random.uniform(0.9, 1.2)
+            self.health = 900
+            self.damage = 40
+            self.knockback_resistance = 1.0
+            self.score_value = 2500
         else:
             self.image = assets["zombie_normal"]
             self.speed = random.uniform(1.5, 2.5)
@@ -278,9 +549,11 @@ class Zombie:
         self.rect = self.image.get_rect(center=(x, y))
         self.max_health = self.health
         self.wobble_offset = random.uniform(0, 6.28)
+        self.aoi_phase = random.randrange(FAR_UPDATE_INTERVAL)
+        self.draw_pos = self.prev_draw_pos = self.rect.topleft
     
-    def update(self):
-        self.wobble_offset += 0.1
+    def update(self, steps=1):
+        self.wobble_offset += 0.1 * steps
         wobble_x = math.sin(self.wobble_offset) * 2
         wobble_y = math.cos(self.wobble_offset * 1.5) * 2
         self.draw_pos = (self.rect.x + wobble_x, self.rect.y + wobble_y)
@@ -304,6 +577,7 @@ class Supply:
         self.image = self.images[self.type]
         self.rect = self.image.get_rect(center=(x, y))
         self.bob_offset = random.uniform(0, 6.28)
+        self.bob_y = 0
         self.value = {
             "normal": 1,
             "health": 20,
@@ -323,33 +597,629 @@ class Bullet:
         self.velocity = [math.cos(angle) * self.speed, math.sin(angle) * self.speed]
         self.damage = damage
         self.color = color
+        self.life = BULLET_LIFETIME
+        self.prev_center = self.rect.center
     
     def update(self):
         self.rect.x += self.velocity[0]
         self.rect.y += self.velocity[1]
-        return not (0 <= self.rect.x <= WIDTH and 0 <= self.rect.y <= HEIGHT)
+        self.life -= 1
+        return self.life <= 0 or not (0 <= self.rect.x <= WORLD_WIDTH and 0 <= self.rect.y <= WORLD_HEIGHT)
 
-class ZombieEscape:
+ZOMBIE_TYPES = ["normal"] * 7 + ["fast"] * 2 + ["tank"] * 1
+
+def edge_spawn_position(side, view):
+    if side == 0:
+        return random.randint(view.left, view.right), view.top - 50
+    elif side == 1:
+        return view.right + 50, random.randint(view.top, view.bottom)
+    elif side == 2:
+        return random.randint(view.left, view.right), view.bottom + 50
+    return view.left - 50, random.randint(view.top, view.bottom)
+
+class WaveDirector:
+    WAVE_LENGTH = 30 * 60
+    BOSS_EVERY = 5
+    SIDES = 4
+    # Each wave sends about this many alive-caps' worth of zombies
+    TURNOVER = 3
+
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)
+        self.tick = 0
+        self.wave = 0
+        self.wave_end = 0
+        # Sorted (tick, zombie_type, side, burst) tuples, consumed by advancing a cursor
+        self.events = []
+        self.cursor = 0
+        # Bosses are queued separately so spawns held by the alive cap never delay them
+        self.bosses = []
+        self.start_wave(1)
+
+    def wave_size(self, wave):
+        return self.max_alive(wave) * self.TURNOVER
+
+    def max_alive(self, wave):
+        return 5 + wave * 2
+
+    def type_weights(self, wave):
+        return {
+            "normal": max(3, 8 - wave),
+            "fast": 2 + wave // 2,
+            "tank": 1 + wave // 3
+        }
+
+    def compile_wave(self, wave):
+        rng = self.rng
+        start = self.tick
+        weights = self.type_weights(wave)
+        types = list(weights)
+        type_weights = list(weights.values())
+        events = []
+        remaining = self.wave_size(wave)
+
+        if wave == 1:
+            for i in range(5):
+                events.append((start, "normal", i % self.SIDES, 1))
+            remaining -= 5
+
+        if wave % self.BOSS_EVERY == 0:
+            side = rng.randrange(self.SIDES)
+            events.append((start, "boss", side, 1))
+            events.append((start + 30, "fast", side, 3))
+
+        bursts = []
+        while remaining > 0:
+            burst = min(remaining, rng.choice((1, 1, 2, 3)) + wave // 3)
+            bursts.append(burst)
+            remaining -= burst
+
+        # Spread bursts evenly over the wave with some jitter so edges don't pulse in lockstep
+        gap = self.WAVE_LENGTH / (len(bursts) + 1)
+        for i, burst in enumerate(bursts):
+            tick = start + int(gap * (i + 1 + rng.uniform(-0.4, 0.4)))
+            events.append((tick, rng.choices(types, type_weights)[0], rng.randrange(self.SIDES), burst))
+
+        events.sort(key=lambda event: event[0])
+        return events
+
+    def start_wave(self, wave):
+        self.wave = wave
+        self.wave_end = self.tick + self.WAVE_LENGTH
+        # Spawns held back by the alive cap carry over ahead of the new wave, up to one cap's worth
+        carry = []
+        budget = self.max_alive(wave)
+        for event in self.events[self.cursor:]:
+            if budget <= 0:
+                break
+            carry.append(event)
+            budget -= event[3]
+        events = self.compile_wave(wave)
+        self.bosses.extend(event for event in events if event[1] == "boss")
+        self.events = carry + [event for event in events if event[1] != "boss"]
+        self.cursor = 0
+
+    def pending(self):
+        return sum(event[3] for event in self.events[self.cursor:]) + sum(event[3] for event in self.bosses)
+
+    def update(self, alive):
+        self.tick += 1
+        if self.tick >= self.wave_end:
+            self.start_wave(self.wave + 1)
+
+        while self.bosses and self.bosses[0][0] <= self.tick:
+            _, zombie_type, side, burst = self.bosses.pop(0)
+            alive += burst
+            yield zombie_type, side, burst
+
+        events = self.events
+        cap = self.max_alive(self.wave)
+        while self.cursor < len(events) and events[self.cursor][0] <= self.tick:
+            _, zombie_type, side, burst = events[self.cursor]
+            if alive >= cap:
+                break
+            alive += burst
+            self.cursor += 1
+            yield zombie_type, side, burst
+
+class SpatialGrid:
+    def __init__(self, cell_size=128):
+        self.cell_size = cell_size
+        self.cells = {}
+    
+    def rebuild(self, entities):
+        size = self.cell_size
+        cells = self.cells
+        cells.clear()
+        for entity in entities:
+            key = (entity.rect.centerx // size, entity.rect.centery // size)
+            cell = cells.get(key)
+            if cell is None:
+                cells[key] = [entity]
+            else:
+                cell.append(entity)
+    
+    def query(self, rect, margin=None):
+        # Entities are binned by center, so widen the search by up to half a sprite
+        size = self.cell_size
+        margin = size if margin is None else margin
+        cells = self.cells
+        found = []
+        for cx in range((rect.left - margin) // size, (rect.right + margin) // size + 1):
+            for cy in range((rect.top - margin) // size, (rect.bottom + margin) // size + 1):
+                cell = cells.get((cx, cy))
+                if cell:
+                    found.extend(cell)
+        return found
+
+class Camera:
+    def __init__(self, width, height, bounds, zoom=1.0):
+        # rect is in world pixels; zoom is target pixels per world pixel
+        self.rect = pygame.Rect(0, 0, width, height)
+        self.bounds = bounds
+        self.prev_pos = self.rect.topleft
+        self.offset = self.rect.topleft
+        self.zoom = zoom
+        self.screen_zoom = zoom
+    
+    def follow(self, target):
+        self.prev_pos = self.rect.topleft
+        self.rect.center = target.center
+        self.rect.clamp_ip(self.bounds)
+        self.offset = self.rect.topleft
+    
+    def interpolate(self, alpha):
+        x, y = lerp_pos(self.prev_pos, self.rect.topleft, alpha)
+        self.offset = (round(x), round(y))
+    
+    def view(self):
+        return pygame.Rect(self.offset, self.rect.size)
+    
+    def apply(self, pos):
+        if self.zoom == 1:
+            return (pos[0] - self.offset[0], pos[1] - self.offset[1])
+        return ((pos[0] - self.offset[0]) * self.zoom, (pos[1] - self.offset[1]) * self.zoom)
+    
+    def to_world(self, pos):
+        # Window pixels back to world pixels, independent of the render buffer
+        return (pos[0] / self.screen_zoom + self.offset[0], pos[1] / self.screen_zoom + self.offset[1])
+
+class Chunk:
+    def __init__(self, cx, cy, walls, surface):
+        self.cx = cx
+        self.cy = cy
+        self.walls = walls
+        self.surface = surface
+        self.zoom = 1
+        self.zoomed = surface
+    
+    def scaled(self, zoom):
+        # Keep one scaled copy; rescaled only when the zoom changes
+        if zoom == 1:
+            return self.surface
+        if zoom != self.zoom:
+            size = math.ceil(CHUNK_SIZE * zoom) + 1
+            self.zoomed = pygame.transform.scale(self.surface, (size, size))
+            self.zoom = zoom
+        return self.zoomed
+
+class ChunkWorld:
+    def __init__(self, assets, seed=None, chunks=WORLD_CHUNKS, cache_size=CHUNK_CACHE_SIZE,
+                 unload_distance=CHUNK_UNLOAD_DISTANCE):
+        self.assets = assets
+        self.seed = random.randrange(2**32) if seed is None else seed
+        self.chunks_x = self.chunks_y = chunks
+        self.bounds = pygame.Rect(0, 0, chunks * CHUNK_SIZE, chunks * CHUNK_SIZE)
+        self.cache_size = cache_size
+        self.unload_distance = unload_distance
+        self.cache = OrderedDict()
+        # The render thread builds chunks while the simulation unloads them in pipelined mode
+        self.lock = threading.Lock()
+        self.wall_fill = pygame.Surface((150, 150), pygame.SRCALPHA)
+        self.wall_fill.fill((70, 70, 70, 180))
+    
+    def chunk_walls(self, cx, cy):
+        # Seeded per chunk, so a chunk regenerates identically after eviction
+        rng = random.Random((self.seed * 73856093) ^ (cx * 19349663) ^ (cy * 83492791))
+        area = pygame.Rect(cx * CHUNK_SIZE, cy * CHUNK_SIZE, CHUNK_SIZE, CHUNK_SIZE)
+        walls = []
+        
+        if cy == 0 or cy == self.chunks_y - 1:
+            y = 0 if cy == 0 else self.bounds.bottom - 50
+            walls.append(pygame.Rect(area.x, y, CHUNK_SIZE, 50))
+        if cx == 0 or cx == self.chunks_x - 1:
+            x = 0 if cx == 0 else self.bounds.right - 50
+            walls.append(pygame.Rect(x, area.y, 50, CHUNK_SIZE))
+        
+        for _ in range(rng.randint(6, 10)):
+            x = area.x + rng.randrange(CHUNK_SIZE // 50) * 50
+            y = area.y + rng.randrange(CHUNK_SIZE // 50) * 50
+            wall = pygame.Rect(x, y, rng.choice([50, 100, 150]), rng.choice([50, 100, 150])).clip(area)
+            if wall.width and wall.height:
+                walls.append(wall)
+        return walls
+    
+    def render_chunk(self, cx, cy, walls):
+        surface = pygame.Surface((CHUNK_SIZE, CHUNK_SIZE)).convert()
+        background = self.assets["background"]
+        bw, bh = background.get_size()
+        ox, oy = -(cx * CHUNK_SIZE % bw), -(cy * CHUNK_SIZE % bh)
+        for x in range(ox, CHUNK_SIZE, bw):
+            for y in range(oy, CHUNK_SIZE, bh):
+                surface.blit(background, (x, y))
+        
+        for wall in walls:
+            local = wall.move(-cx * CHUNK_SIZE, -cy * CHUNK_SIZE)
+            surface.blit(self.wall_fill, local, (0, 0, local.width, local.height))
+            pygame.draw.rect(surface, (50, 50, 50), local, 2)
+        return surface
+    
+    def get_chunk(self, cx, cy):
+        with self.lock:
+            chunk = self.cache.get((cx, cy))
+            if chunk is not None:
+                self.cache.move_to_end((cx, cy))
+                return chunk
+            
+            walls = self.chunk_walls(cx, cy)
+            chunk = Chunk(cx, cy, walls, self.render_chunk(cx, cy, walls))
+            self.cache[(cx, cy)] = chunk
+            while len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+            return chunk
+    
+    def chunk_range(self, rect):
+        x0 = max(0, rect.left // CHUNK_SIZE)
+        y0 = max(0, rect.top // CHUNK_SIZE)
+        x1 = min(self.chunks_x - 1, (rect.right - 1) // CHUNK_SIZE)
+        y1 = min(self.chunks_y - 1, (rect.bottom - 1) // CHUNK_SIZE)
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                yield cx, cy
+    
+    def unload_far(self, center):
+        pcx, pcy = center[0] // CHUNK_SIZE, center[1] // CHUNK_SIZE
+        with self.lock:
+            for cx, cy in list(self.cache):
+                if max(abs(cx - pcx), abs(cy - pcy)) > self.unload_distance:
+                    del self.cache[(cx, cy)]
+    
+    def draw(self, surface, camera):
+        for cx, cy in self.chunk_range(camera.view()):
+            chunk = self.get_chunk(cx, cy)
+            x, y = camera.apply((cx * CHUNK_SIZE, cy * CHUNK_SIZE))
+            surface.blit(chunk.scaled(camera.zoom), (math.floor(x), math.floor(y)))
+
+def lerp_pos(prev, current, alpha):
+    return (prev[0] + (current[0] - prev[0]) * alpha, prev[1] + (current[1] - prev[1]) * alpha)
+
+def display_refresh_rate():
+    get_rates = getattr(pygame.display, "get_desktop_refresh_rates", None)
+    rates = get_rates() if get_rates else []
+    return rates[0] if rates and rates[0] > 0 else 60
+
+class FramePacer:
+    def __init__(self, mode="60"):
+        self.step = 1 / SIM_RATE
+        self.clock = pygame.time.Clock()
+        self.accumulator = 0.0
+        self.alpha = 1.0
+        self.raw_ms = 0.0
+        self.set_mode(mode)
+    
+    def set_mode(self, mode):
+        self.mode = mode
+        self.vsync = False
+        if mode == "uncapped":
+            self.fps = 0
+        elif mode == "adaptive":
+            # Prefer real vsync; fall back to stepping down through fixed caps under load
+            try:
+                open_display(vsync=True)
+                self.vsync = True
+            except pygame.error:
+                pass
+            refresh = display_refresh_rate()
+            self.rates = [rate for rate in ADAPTIVE_RATES if rate <= refresh] or [refresh]
+            self.rate_index = 0
+            self.fps = 0 if self.vsync else self.rates[0]
+        else:
+            self.fps = int(mode)
+    
+    def adapt(self):
+        budget = 1000 / self.rates[self.rate_index]
+        if self.raw_ms > budget * 0.9 and self.rate_index < len(self.rates) - 1:
+            self.rate_index += 1
+        elif self.rate_index > 0 and self.raw_ms < 500 / self.rates[self.rate_index - 1]:
+            self.rate_index -= 1
+        self.fps = self.rates[self.rate_index]
+    
+    def wait(self):
+        elapsed = self.clock.tick(self.fps) / 1000
+        # Smoothed render cost, excluding the time tick() spent waiting
+        self.raw_ms += (self.clock.get_rawtime() - self.raw_ms) * 0.05
+        if self.mode == "adaptive" and not self.vsync:
+            self.adapt()
+        return elapsed
+    
+    def tick(self):
+        # Drop time we can't catch up on rather than spiralling
+        self.accumulator += min(self.wait(), self.step * MAX_SIM_STEPS)
+    
+    def steps(self):
+        while self.accumulator >= self.step:
+            self.accumulator -= self.step
+            yield
+        self.alpha = self.accumulator / self.step
+
+class RenderSnapshot:
+    # Everything draw_game needs for one simulation tick, copied into tuples so the
+    # renderer can read it while the simulation moves on. Never mutated once built.
+    __slots__ = ("tick", "time", "state", "camera", "supplies", "bullets", "zombies",
+                 "player", "particles", "hud")
+    
+    def __init__(self, tick, state):
+        self.tick = tick
+        self.time = time.perf_counter()
+        self.state = state
+        self.camera = None
+        self.supplies = ()
+        self.bullets = ()
+        self.zombies = ()
+        self.player = None
+        self.particles = ()
+        self.hud = None
+
+class SnapshotBuffer:
     def __init__(self):
+        self.lock = threading.Lock()
+        self.back = None
+        self.front = None
+    
+    def publish(self, snapshot):
+        # Simulation side: replace the back buffer with the newest finished tick
+        with self.lock:
+            self.back = snapshot
+    
+    def swap(self):
+        # Render side: take the newest snapshot if there is one, else keep drawing the last
+        with self.lock:
+            if self.back is not None:
+                self.front, self.back = self.back, None
+        return self.front
+
+class RenderScaler:
+    def __init__(self, scale=1.0):
+        self.buffer = None
+        self.frame_ms = 0.0
+        self.cooldown = 0
+        self.set_scale(scale)
+    
+    def set_scale(self, scale):
+        self.adaptive = scale == "adaptive"
+        self.scale = RENDER_SCALES[0] if self.adaptive else min(1.0, float(scale))
+        self.scale_index = 0
+    
+    def target(self, screen):
+        # Full scale draws straight to the window; otherwise into a smaller buffer
+        if self.scale >= 1.0:
+            return screen
+        size = (max(1, int(screen.get_width() * self.scale)), max(1, int(screen.get_height() * self.scale)))
+        if self.buffer is None or self.buffer.get_size() != size:
+            self.buffer = pygame.Surface(size).convert()
+        return self.buffer
+    
+    def present(self, target, screen):
+        if target is not screen:
+            pygame.transform.scale(target, screen.get_size(), screen)
+    
+    def adapt(self, frame_ms, budget_ms):
+        self.frame_ms += (frame_ms - self.frame_ms) * 0.05
+        if not self.adaptive:
+            return
+        if self.cooldown > 0:
+            self.cooldown -= 1
+            return
+        if self.frame_ms > budget_ms * 0.9 and self.scale_index < len(RENDER_SCALES) - 1:
+            self.scale_index += 1
+        elif self.frame_ms < budget_ms * 0.5 and self.scale_index > 0:
+            self.scale_index -= 1
+        else:
+            return
+        self.scale = RENDER_SCALES[self.scale_index]
+        # Give the smoothed frame time a moment to settle at the new scale
+        self.cooldown = SIM_RATE
+
+class InputState:
+    __slots__ = ("move_x", "move_y", "aim", "fire", "dash", "reload", "switch")
+    
+    def __init__(self):
+        self.aim = (0, 0)
+        self.clear()
+    
+    def clear(self):
+        self.move_x = 0
+        self.move_y = 0
+        self.fire = False
+        self.dash = False
+        self.reload = False
+        self.switch = 0
+
+class KeyboardController:
+    def __init__(self):
+        self.controls = InputState()
+        self.pending = InputState()
+    
+    def handle_event(self, game, event):
+        # One-shot actions are latched here and handed over on the next simulation step
+        pending = self.pending
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_SPACE:
+                pending.dash = True
+            elif event.key == pygame.K_r:
+                pending.reload = True
+            elif event.key == pygame.K_q:
+                pending.switch = -1
+            elif event.key == pygame.K_e:
+                pending.switch = 1
+        elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            pending.fire = True
+            pending.aim = game.camera.to_world(event.pos)
+    
+    def poll(self, game):
+        controls = self.controls
+        pending = self.pending
+        keys = pygame.key.get_pressed()
+        dx, dy = 0, 0
+        if keys[pygame.K_LEFT]: dx = -1
+        if keys[pygame.K_RIGHT]: dx = 1
+        if keys[pygame.K_UP]: dy = -1
+        if keys[pygame.K_DOWN]: dy = 1
+        
+        controls.move_x, controls.move_y = dx, dy
+        controls.fire = pending.fire
+        controls.dash = pending.dash
+        controls.reload = pending.reload
+        controls.switch = pending.switch
+        controls.aim = pending.aim if pending.fire else game.camera.to_world(pygame.mouse.get_pos())
+        pending.clear()
+        return controls
+
+BOT_PROFILES = {
+    "easy": {"reaction": 30, "aim_error": 0.3, "kite_distance": 120, "dash_distance": 0,
+             "engage_range": 350, "supply_range": 150},
+    "normal": {"reaction": 12, "aim_error": 0.12, "kite_distance": 180, "dash_distance": 70,
+               "engage_range": 500, "supply_range": 300},
+    "hard": {"reaction": 4, "aim_error": 0.04, "kite_distance": 240, "dash_distance": 110,
+             "engage_range": 650, "supply_range": 450}
+}
+
+class BotController:
+    def __init__(self, profile="normal", seed=None):
+        self.name = profile
+        self.profile = BOT_PROFILES[profile]
+        self.rng = random.Random(seed)
+        self.controls = InputState()
+        self.target = None
+        self.retarget = 0
+        self.strafe = 1
+    
+    def handle_event(self, game, event):
+        pass
+    
+    def steer(self, dx, dy):
+        # Quantize a direction to the same 8-way digital input a keyboard produces
+        length = max(1e-6, math.hypot(dx, dy))
+        self.controls.move_x = 1 if dx / length > 0.38 else -1 if dx / length < -0.38 else 0
+        self.controls.move_y = 1 if dy / length > 0.38 else -1 if dy / length < -0.38 else 0
+    
+    def pick_weapon(self, player, distance):
+        desired = 1 if distance < 150 else 2 if distance > 350 else 0
+        if player.weapons[desired].ammo == 0 or desired == player.current_weapon:
+            return 0
+        steps = (desired - player.current_weapon) % len(player.weapons)
+        return 1 if steps <= len(player.weapons) // 2 else -1
+    
+    def poll(self, game):
+        profile = self.profile
+        controls = self.controls
+        controls.clear()
+        player = game.player
+        px, py = player.rect.center
+        
+        search = profile["engage_range"]
+        nearest, nearest_dist = None, float("inf")
+        for zombie in game.zombie_grid.query(player.rect.inflate(search * 2, search * 2), 0):
+            if zombie.health > 0:
+                dist = math.hypot(zombie.rect.centerx - px, zombie.rect.centery - py)
+                if dist < nearest_dist:
+                    nearest, nearest_dist = zombie, dist
+        
+        self.retarget -= 1
+        if self.target is None or self.target.health <= 0 or self.retarget <= 0:
+            self.target = nearest
+            self.retarget = profile["reaction"]
+        
+        supply = min(game.supplies, default=None,
+                     key=lambda s: math.hypot(s.rect.centerx - px, s.rect.centery - py))
+        supply_dist = math.hypot(supply.rect.centerx - px, supply.rect.centery - py) if supply else float("inf")
+        
+        if nearest and nearest_dist < profile["kite_distance"]:
+            # Back away from the closest zombie while circling it
+            ax, ay = px - nearest.rect.centerx, py - nearest.rect.centery
+            length = max(1, math.hypot(ax, ay))
+            if self.rng.random() < 0.01:
+                self.strafe = -self.strafe
+            self.steer(ax / length - ay / length * 0.6 * self.strafe, ay / length + ax / length * 0.6 * self.strafe)
+            if nearest_dist < profile["dash_distance"] and player.dash_cooldown == 0:
+                controls.dash = True
+        elif supply and supply_dist < profile["supply_range"]:
+            self.steer(supply.rect.centerx - px, supply.rect.centery - py)
+        elif self.target:
+            tx, ty = self.target.rect.center
+            if math.hypot(tx - px, ty - py) > profile["engage_range"] * 0.8:
+                self.steer(tx - px, ty - py)
+        
+        weapon = player.get_weapon()
+        if weapon.reload_timer <= 0 and (weapon.ammo == 0 or
+                (weapon.ammo < weapon.max_ammo * 0.3 and nearest_dist > profile["kite_distance"] * 1.5)):
+            controls.reload = True
+        elif nearest:
+            controls.switch = self.pick_weapon(player, nearest_dist)
+        
+        if self.target and weapon.can_fire():
+            tx, ty = self.target.rect.center
+            dist = math.hypot(tx - px, ty - py)
+            if dist < profile["engage_range"]:
+                error = profile["aim_error"] * dist
+                controls.fire = True
+                controls.aim = (tx + self.rng.uniform(-error, error), ty + self.rng.uniform(-error, error))
+        return controls
+
+class ZombieEscape:
+    def __init__(self, pacing="60", headless=False, telemetry=None, controller=None, diagnostics=None,
+                 render_scale=1.0):
+        ensure_display()
         self.state = USERNAME
         self.assets = load_assets()
         self.player = None
         self.zombies = []
         self.supplies = []
-        self.walls = []
+        self.world = None
         self.bullets = []
         self.particles = ParticleSystem()
         self.blood_particles = ParticleSystem()
-        self.clock = pygame.time.Clock()
+        self.surface_cache = SurfaceCache()
+        self.controller = controller or KeyboardController()
+        self.events = EventBus()
+        if not headless:
+            AudioEffects(self.assets["sounds"]).attach(self.events)
+            VisualEffects(self.particles, self.blood_particles).attach(self.events)
+        self.telemetry = telemetry
+        if telemetry:
+            telemetry.attach(self.events)
+        self.diagnostics = diagnostics
+        self.zombie_grid = SpatialGrid()
+        self.camera = Camera(*view_size(), pygame.Rect(0, 0, WORLD_WIDTH, WORLD_HEIGHT), HEIGHT / VIEW_HEIGHT)
+        self.render_camera = Camera(*view_size(), self.camera.bounds, HEIGHT / VIEW_HEIGHT)
+        self.scaler = RenderScaler(render_scale)
+        self.tick = 0
+        self.render_stats = {"zombies_drawn": 0, "particles_drawn": 0}
+        self.pacer = FramePacer(pacing)
+        self.snapshots = None
+        self.sim_thread = None
+        self.sim_error = None
+        self.stopping = False
+        self.input_lock = threading.Lock()
+        self.input_events = []
         self.font_large = pygame.font.Font(None, 72)
         self.font_medium = pygame.font.Font(None, 48)
         self.font_small = pygame.font.Font(None, 36)
         self.font_outline = pygame.font.Font(None, 80)
         self.time_limit = 180
-        self.start_ticks = 0
         self.wave = 1
-        self.zombies_to_spawn = 8
-        self.zombie_spawn_timer = 0
+        self.director = WaveDirector()
+        self.zombies_to_spawn = self.director.pending()
         self.supply_spawn_timer = 0
         self.username = ""
         self.username_active = True
@@ -365,21 +1235,9 @@ class ZombieEscape:
         ]
         self.selected_item = 0
     
-    def generate_maze(self):
-        self.walls = []
-        for x in range(0, WIDTH, 50):
-            self.walls.append(pygame.Rect(x, 0, 50, 50))
-            self.walls.append(pygame.Rect(x, HEIGHT-50, 50, 50))
-        for y in range(50, HEIGHT-50, 50):
-            self.walls.append(pygame.Rect(0, y, 50, 50))
-            self.walls.append(pygame.Rect(WIDTH-50, y, 50, 50))
-        
-        for _ in range(25):
-            x = random.randint(1, (WIDTH-100)//50) * 50
-            y = random.randint(1, (HEIGHT-100)//50) * 50
-            width = random.choice([50, 100, 150])
-            height = random.choice([50, 100, 150])
-            self.walls.append(pygame.Rect(x, y, width, height))
+    def generate_maze(self, seed=None):
+        self.world = ChunkWorld(self.assets, seed, WORLD_CHUNKS, *chunk_budget(self.camera.rect.size))
+        self.camera.bounds = self.world.bounds
     
     def draw_username_screen(self):
         win.fill(BLACK)
@@ -420,13 +1278,6 @@ class ZombieEscape:
         # Instructions
         instr = self.font_small.render("Press ENTER to confirm your callsign", True, (200, 200, 255))
         win.blit(instr, (WIDTH//2 - instr.get_width()//2, HEIGHT - 100))
-        
-        # Play typing sound effect
-        if self.typing_sound_delay > 0:
-            self.typing_sound_delay -= 1
-        elif len(self.username) > 0 and self.username_active:
-            self.assets["sounds"]["typing"].play()
-            self.typing_sound_delay = 10
     
     def draw_access_granted(self):
         pulse = 0.5 + 0.5 * math.sin(pygame.time.get_ticks() * 0.005)
@@ -453,49 +1304,54 @@ class ZombieEscape:
         if self.access_granted_timer > 0:
             countdown = self.font_small.render(f"Starting in {self.access_granted_timer//60 + 1}...", True, WHITE)
             win.blit(countdown, (WIDTH//2 - countdown.get_width()//2, HEIGHT - 100))
-            self.access_granted_timer -= 1
-        else:
-            self.state = MENU
     
     def begin_playing(self):
         self.state = PLAYING
         self.player = Player(self.assets)
+        self.camera.follow(self.player.rect)
+        self.tick = 0
+        self.events.tick = 0
+        self.events.emit(ROUND_STARTED, *self.player.rect.center, self.world.seed)
         self.zombies = []
-        self.supplies = [Supply(random.randint(100, WIDTH-100), random.randint(100, HEIGHT-100), self.assets) for _ in range(5)]
+        self.zombie_grid.rebuild(self.zombies)
+        self.supplies = [self.spawn_supply() for _ in range(5)]
         self.bullets = []
         self.wave = 1
-        self.zombies_to_spawn = 8
-        self.start_ticks = pygame.time.get_ticks()
-        self.spawn_zombies(5)
+        self.director = WaveDirector()
+        self.zombies_to_spawn = self.director.pending()
+        if self.diagnostics:
+            self.diagnostics.round_started(self)
     
-    def spawn_zombies(self, count):
-        zombie_types = ["normal"] * 7 + ["fast"] * 2 + ["tank"] * 1
-        
+    def spawn_supply(self):
+        view = self.camera.rect
+        supply = Supply(random.randint(view.left + 100, view.right - 100),
+                        random.randint(view.top + 100, view.bottom - 100), self.assets)
+        self.events.emit(SUPPLY_SPAWNED, *supply.rect.center, supply.value, supply)
+        return supply
+    
+    def spawn_zombies(self, count, zombie_type=None, side=None):
         for _ in range(count):
-            side = random.randint(0, 3)
-            if side == 0:
-                x, y = random.randint(0, WIDTH), -50
-            elif side == 1:
-                x, y = WIDTH + 50, random.randint(0, HEIGHT)
-            elif side == 2:
-                x, y = random.randint(0, WIDTH), HEIGHT + 50
-            else:
-                x, y = -50, random.randint(0, HEIGHT)
-            
-            zombie_type = random.choice(zombie_types)
-            self.zombies.append(Zombie(x, y, zombie_type, self.assets))
+            x, y = edge_spawn_position(random.randint(0, 3) if side is None else side, self.camera.rect)
+            self.zombies.append(Zombie(x, y, zombie_type or random.choice(ZOMBIE_TYPES), self.assets))
     
     def show_instructions(self):
         self.state = INSTRUCTIONS
     
     def quit_game(self):
+        if threading.current_thread() is not threading.main_thread():
+            # The main thread owns the window; it shuts down once the simulation stops
+            self.stopping = True
+            return
+        self.stop_pipeline()
+        if self.telemetry:
+            self.telemetry.close()
+        if self.diagnostics and self.diagnostics.path:
+            self.diagnostics.dump(self.diagnostics.path, self)
         pygame.quit()
         sys.exit()
     
     def draw_menu(self):
-        overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 200))
-        win.blit(overlay, (0, 0))
+        win.blit(self.surface_cache.fill((WIDTH, HEIGHT), (0, 0, 0, 200)), (0, 0))
         
         title_text = "ULTIMATE ZOMBIE ESCAPE"
         for i, char in enumerate(title_text):
@@ -523,9 +1379,7 @@ class ZombieEscape:
         win.blit(zombie_img, (WIDTH - 100 - zombie_img.get_width(), HEIGHT//2))
     
     def draw_instructions(self):
-        overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 220))
-        win.blit(overlay, (0, 0))
+        win.blit(self.surface_cache.fill((WIDTH, HEIGHT), (0, 0, 0, 220)), (0, 0))
         
         title = self.font_large.render("HOW TO PLAY", True, RED)
         win.blit(title, (WIDTH//2 - title.get_width()//2, 50))
@@ -552,6 +1406,7 @@ class ZombieEscape:
             "Normal - Average speed and health",
             "Fast - Quick but fragile",
             "Tank - Slow but tough",
+            "Boss - Every 5th wave, huge and relentless",
             "",
             "Press any key to return to menu"
         ]
@@ -560,11 +1415,18 @@ class ZombieEscape:
             text = self.font_small.render(line, True, WHITE)
             win.blit(text, (WIDTH//2 - text.get_width()//2, 150 + i * 25))
     
-    def handle_events(self):
-        for event in pygame.event.get():
+    def handle_events(self, events=None):
+        for event in pygame.event.get() if events is None else events:
             if event.type == pygame.QUIT:
                 self.quit_game()
             
+            if event.type == pygame.KEYDOWN and self.diagnostics and event.key in (pygame.K_F3, pygame.K_F4):
+                if event.key == pygame.K_F3:
+                    self.diagnostics.visible = not self.diagnostics.visible
+                else:
+                    self.diagnostics.dump(self.diagnostics.path or "diagnostics.json", self)
+                continue
+            
             if event.type == pygame.KEYDOWN:
                 if self.state == USERNAME:
                     if event.key == pygame.K_RETURN:
@@ -593,28 +1455,13 @@ class ZombieEscape:
                 elif self.state == PLAYING:
                     if event.key == pygame.K_ESCAPE:
                         self.state = PAUSED
-                    elif event.key == pygame.K_SPACE:
-                        keys = pygame.key.get_pressed()
-                        dx, dy = 0, 0
-                        if keys[pygame.K_LEFT]: dx = -1
-                        if keys[pygame.K_RIGHT]: dx = 1
-                        if keys[pygame.K_UP]: dy = -1
-                        if keys[pygame.K_DOWN]: dy = 1
-                        
-                        if dx != 0 or dy != 0:
-                            if self.player.dash([dx, dy]):
-                                self.assets["sounds"]["dash"].play()
-                    elif event.key == pygame.K_r:
-                        if self.player.get_weapon().reload():
-                            self.assets["sounds"]["reload"].play()
-                    elif event.key == pygame.K_q:
-                        self.player.switch_weapon(-1)
-                        self.assets["sounds"]["weapon_switch"].play()
-                    elif event.key == pygame.K_e:
-                        self.player.switch_weapon(1)
-                        self.assets["sounds"]["weapon_switch"].play()
+                        self.events.emit(GAME_PAUSED, *self.player.rect.center)
+                    else:
+                        self.controller.handle_event(self, event)
                 
                 elif self.state in [PAUSED, GAME_OVER, VICTORY]:
+                    if self.state == PAUSED and event.key in (pygame.K_r, pygame.K_ESCAPE, pygame.K_m):
+                        self.events.emit(GAME_RESUMED, *self.player.rect.center)
                     if event.key == pygame.K_r:
                         self.begin_playing()
                     elif event.key == pygame.K_ESCAPE and self.state == PAUSED:
@@ -625,9 +1472,8 @@ class ZombieEscape:
                 elif self.state == INSTRUCTIONS:
                     self.state = MENU
             
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                if self.state == PLAYING and event.button == 1:
-                    self.shoot(pygame.mouse.get_pos())
+            if event.type == pygame.MOUSEBUTTONDOWN and self.state == PLAYING:
+                self.controller.handle_event(self, event)
     
     def shoot(self, target_pos):
         weapon = self.player.get_weapon()
@@ -635,50 +1481,88 @@ class ZombieEscape:
         if not weapon.can_fire():
             if weapon.ammo <= 0:
                 if weapon.reload():
-                    self.assets["sounds"]["reload"].play()
+                    self.events.emit(WEAPON_RELOADED, *self.player.rect.center, self.player.current_weapon)
             return
         
         new_bullets = weapon.fire(self.player.rect.center, target_pos)
         if new_bullets:
-            self.assets["sounds"]["shoot"].play()
             self.bullets.extend(new_bullets)
-            self.particles.add_particles(self.player.rect.center, (255, 255, 200), 15, 3, 15)
+            self.events.emit(WEAPON_FIRED, *self.player.rect.center, self.player.current_weapon)
+    
+    def apply_controls(self, controls):
+        player = self.player
+        if controls.switch:
+            player.switch_weapon(controls.switch)
+            self.events.emit(WEAPON_SWITCHED, *player.rect.center, player.current_weapon)
+        if controls.reload and player.get_weapon().reload():
+            self.events.emit(WEAPON_RELOADED, *player.rect.center, player.current_weapon)
+        if controls.dash and (controls.move_x or controls.move_y):
+            if player.dash([controls.move_x, controls.move_y]):
+                self.events.emit(PLAYER_DASHED, *player.rect.center)
+        
+        if not player.dashing:
+            dx, dy = controls.move_x, controls.move_y
+            if dx != 0 and dy != 0:
+                dx *= 0.7071
+                dy *= 0.7071
+            
+            player.rect.x += dx * player.speed
+            player.rect.y += dy * player.speed
+        
+        if controls.fire:
+            self.shoot(controls.aim)
+    
+    def elapsed_seconds(self):
+        return self.tick / SIM_RATE
+    
+    def update_screens(self):
+        if self.state == USERNAME:
+            # Play typing sound effect
+            if self.typing_sound_delay > 0:
+                self.typing_sound_delay -= 1
+            elif len(self.username) > 0 and self.username_active:
+                self.assets["sounds"]["typing"].play()
+                self.typing_sound_delay = 10
+        elif self.state == ACCESS_GRANTED:
+            if self.access_granted_timer > 0:
+                self.access_granted_timer -= 1
+            else:
+                self.state = MENU
     
     def update(self):
         if self.state != PLAYING:
+            self.update_screens()
             return
         
-        self.zombie_spawn_timer -= 1
-        if self.zombie_spawn_timer <= 0 and len(self.zombies) < 5 + self.wave * 2:
-            self.spawn_zombies(1)
-            self.zombie_spawn_timer = 60
+        self.tick += 1
+        self.events.tick = self.tick
+        self.player.prev_pos = self.player.rect.topleft
+        for zombie in self.zombies:
+            zombie.prev_draw_pos = zombie.draw_pos
+        for bullet in self.bullets:
+            bullet.prev_center = bullet.rect.center
+        for zombie_type, side, burst in self.director.update(len(self.zombies)):
+            self.spawn_zombies(burst, zombie_type, side)
+            self.zombies_to_spawn -= burst
+        if self.director.wave != self.wave:
+            self.wave = self.director.wave
+            self.zombies_to_spawn = self.director.pending()
         
         self.supply_spawn_timer -= 1
         if self.supply_spawn_timer <= 0 and len(self.supplies) < 3 + self.wave:
-            self.supplies.append(Supply(
-                random.randint(100, WIDTH-100),
-                random.randint(100, HEIGHT-100),
-                self.assets
-            ))
+            self.supplies.append(self.spawn_supply())
             self.supply_spawn_timer = 300
         
-        keys = pygame.key.get_pressed()
-        if not self.player.dashing:
-            dx, dy = 0, 0
-            if keys[pygame.K_LEFT]: dx = -1
-            if keys[pygame.K_RIGHT]: dx = 1
-            if keys[pygame.K_UP]: dy = -1
-            if keys[pygame.K_DOWN]: dy = 1
-            
-            if dx != 0 and dy != 0:
-                dx *= 0.7071
-                dy *= 0.7071
-            
-            self.player.rect.x += dx * self.player.speed
-            self.player.rect.y += dy * self.player.speed
-        
+        self.apply_controls(self.controller.poll(self))
         self.player.update()
-        
+        self.camera.follow(self.player.rect)
+        if self.tick % 60 == 0:
+            self.world.unload_far(self.player.rect.center)
+            # Supplies left far behind would otherwise hold the spawn cap forever
+            keep = self.camera.rect.inflate(self.camera.rect.width * 2, self.camera.rect.height * 2)
+            self.supplies = [supply for supply in self.supplies if keep.colliderect(supply.rect)]
+        
+        near_view = self.camera.rect.inflate(AOI_MARGIN * 2, AOI_MARGIN * 2)
         for zombie in self.zombies:
             dx = self.player.rect.centerx - zombie.rect.centerx
             dy = self.player.rect.centery - zombie.rect.centery
@@ -686,31 +1570,27 @@ class ZombieEscape:
             
             zombie.rect.x += (dx / dist) * zombie.speed
             zombie.rect.y += (dy / dist) * zombie.speed
-            zombie.update()
+            if near_view.colliderect(zombie.rect):
+                zombie.update()
+            elif (self.tick + zombie.aoi_phase) % FAR_UPDATE_INTERVAL == 0:
+                zombie.update(FAR_UPDATE_INTERVAL)
+        self.zombie_grid.rebuild(self.zombies)
         
         for bullet in self.bullets[:]:
             if bullet.update():
                 self.bullets.remove(bullet)
                 continue
             
-            for zombie in self.zombies[:]:
-                if bullet.rect.colliderect(zombie.rect):
+            for zombie in self.zombie_grid.query(bullet.rect):
+                if zombie.health > 0 and bullet.rect.colliderect(zombie.rect):
                     zombie.health -= bullet.damage
-                    self.blood_particles.add_particles(
-                        zombie.rect.center, 
-                        BLOOD_RED, 
-                        20, 
-                        2, 
-                        30,
-                        size_range=(3, 6) if zombie.type == "tank" else (2, 5)
-                    )
+                    self.events.emit(ZOMBIE_HIT, *zombie.rect.center, bullet.damage, zombie.type)
                     
                     if zombie.health <= 0:
-                        self.assets["sounds"]["zombie_death"].play()
                         self.zombies.remove(zombie)
                         self.player.kills += 1
                         self.player.score += zombie.score_value
-                        self.particles.add_particles(zombie.rect.center, GREEN, 30, 3, 40)
+                        self.events.emit(ZOMBIE_KILLED, *zombie.rect.center, zombie.score_value, zombie.type)
                     
                     if bullet in self.bullets:
                         self.bullets.remove(bullet)
@@ -720,32 +1600,28 @@ class ZombieEscape:
             supply.update()
             
             if self.player.rect.colliderect(supply.rect):
-                self.assets["sounds"]["collect"].play()
-                
                 if supply.type == "normal":
                     self.player.score += 50
                 elif supply.type == "health":
                     self.player.health = min(self.player.max_health, self.player.health + supply.value)
                 elif supply.type == "speed":
                     self.player.speed = self.player.base_speed + supply.value
-                    pygame.time.set_timer(pygame.USEREVENT, 5000)
+                    self.player.speed_boost_timer = SPEED_BOOST_TICKS
                 elif supply.type == "ammo":
                     for weapon in self.player.weapons:
                         weapon.ammo = min(weapon.max_ammo, weapon.ammo + supply.value)
                 elif supply.type == "score":
                     self.player.score += supply.value
                 
-                self.particles.add_particles(supply.rect.center, supply.image.get_at((15, 15))[:3], 20, 2, 30)
+                self.events.emit(SUPPLY_COLLECTED, *supply.rect.center, supply.value, supply)
                 self.supplies.remove(supply)
         
         if not self.player.invincible and not self.player.dashing:
-            for zombie in self.zombies:
-                if self.player.rect.colliderect(zombie.rect):
-                    self.assets["sounds"]["hit"].play()
-                    
+            for zombie in self.zombie_grid.query(self.player.rect):
+                if zombie.health > 0 and self.player.rect.colliderect(zombie.rect):
                     self.player.health -= zombie.damage
                     self.player.invincible = True
-                    self.player.invincible_timer = pygame.time.get_ticks()
+                    self.player.invincible_timer = INVINCIBLE_TICKS
                     
                     dx = self.player.rect.centerx - zombie.rect.centerx
                     dy = self.player.rect.centery - zombie.rect.centery
@@ -754,115 +1630,147 @@ class ZombieEscape:
                     self.player.rect.x += (dx / dist) * knockback
                     self.player.rect.y += (dy / dist) * knockback
                     
-                    self.blood_particles.add_particles(self.player.rect.center, BLOOD_RED, 30, 3, 40)
+                    self.events.emit(PLAYER_HIT, *self.player.rect.center, zombie.damage, zombie.type)
                     
                     if self.player.health <= 0:
                         self.state = GAME_OVER
-                        self.assets["sounds"]["game_over"].play()
+                        self.events.emit(PLAYER_DIED, *self.player.rect.center)
                     break
         
-        elapsed = (pygame.time.get_ticks() - self.start_ticks) / 1000
-        if elapsed >= self.time_limit:
+        if self.elapsed_seconds() >= self.time_limit:
             self.state = VICTORY
-            self.assets["sounds"]["victory"].play()
-        
-        self.wave = 1 + int(elapsed / 30)
+            self.events.emit(ROUND_WON, *self.player.rect.center)
         
         self.particles.update()
         self.blood_particles.update()
     
-    def draw_game(self):
-        win.blit(self.assets["background"], (0, 0))
-        
-        for wall in self.walls:
-            wall_surface = pygame.Surface((wall.width, wall.height), pygame.SRCALPHA)
-            wall_surface.fill((70, 70, 70, 180))
-            win.blit(wall_surface, (wall.x, wall.y))
-            pygame.draw.rect(win, (50, 50, 50, 180), wall, 2)
-        
-        for supply in self.supplies:
-            pos = (supply.rect.x, supply.rect.y + supply.bob_y)
-            win.blit(supply.image, pos)
+    def capture(self):
+        snapshot = RenderSnapshot(self.tick, self.state)
+        if self.player is None:
+            return snapshot
+        camera = self.camera
+        snapshot.camera = (camera.prev_pos, camera.rect.topleft)
+        snapshot.supplies = tuple((supply.image, supply.rect.x, supply.rect.y + supply.bob_y)
+                                  for supply in self.supplies)
+        snapshot.bullets = tuple((bullet.prev_center, bullet.rect.center, bullet.color) for bullet in self.bullets)
+        snapshot.zombies = tuple((zombie.image, zombie.prev_draw_pos, zombie.draw_pos, zombie.health / zombie.max_health)
+                                 for zombie in self.zombie_grid.query(camera.rect) if zombie.health > 0)
+        player = self.player
+        snapshot.player = (player.image, player.prev_pos, player.rect.topleft, player.rect.width,
+                           player.dashing, tuple(player.dash_direction), player.invincible)
+        view = camera.rect.inflate(AOI_MARGIN, AOI_MARGIN)
+        snapshot.particles = tuple(self.particles.visible(view) + self.blood_particles.visible(view))
+        weapon = player.get_weapon()
+        snapshot.hud = {
+            "health": player.health,
+            "max_health": player.max_health,
+            "weapon": f"{weapon.name}: {weapon.ammo}/{weapon.max_ammo}",
+            "weapon_color": weapon.color,
+            "reload": 1 - weapon.reload_timer / weapon.reload_time if weapon.reload_timer > 0 else None,
+            "score": player.score,
+            "kills": player.kills,
+            "time_left": max(0, self.time_limit - self.elapsed_seconds()),
+            "wave": self.wave,
+            "dash_cooldown": player.dash_cooldown
+        }
+        return snapshot
+    
+    def draw_game(self, snapshot=None, alpha=None):
+        if snapshot is None:
+            snapshot = self.capture()
+        if alpha is None:
+            alpha = self.pacer.alpha
+        # Render between the last two simulation steps; frozen screens show the latest one
+        if snapshot.state != PLAYING:
+            alpha = 1.0
+        camera = self.render_camera
+        camera.prev_pos, camera.rect.topleft = snapshot.camera
+        camera.interpolate(alpha)
+        # The world may render into a smaller buffer; the HUD always draws at window resolution
+        target = self.scaler.target(win)
+        camera.zoom = zoom = target.get_height() / camera.rect.height
+        scaled = self.surface_cache.scaled
+        self.world.draw(target, camera)
+        
+        for image, x, y in snapshot.supplies:
+            pos = camera.apply((x, y))
+            sprite = scaled(image, zoom)
+            target.blit(sprite, pos)
             if pygame.time.get_ticks() % 1000 < 500:
-                glow = pygame.Surface((supply.rect.width, supply.rect.height), pygame.SRCALPHA)
-                alpha = int(100 + 155 * abs(math.sin(pygame.time.get_ticks() * 0.005)))
-                color = supply.image.get_at((15, 15))[:3] + (alpha,)
-                pygame.draw.rect(glow, color, (0, 0, supply.rect.width, supply.rect.height), 3)
-                win.blit(glow, pos)
-        
-        for bullet in self.bullets:
-            pygame.draw.circle(win, bullet.color, bullet.rect.center, 4)
-            pygame.draw.circle(win, (min(255, bullet.color[0]+100), min(255, bullet.color[1]+100), min(255, bullet.color[2]+100)), bullet.rect.center, 2)
-        
-        for zombie in self.zombies:
-            win.blit(zombie.image, zombie.draw_pos)
-            health_width = int(40 * (zombie.health / zombie.max_health))
-            health_color = GREEN if zombie.health > zombie.max_health * 0.6 else YELLOW if zombie.health > zombie.max_health * 0.3 else RED
-            pygame.draw.rect(win, health_color, (zombie.draw_pos[0], zombie.draw_pos[1] - 10, health_width, 5))
-        
-        if self.player.dashing:
+                glow_alpha = int(100 + 155 * abs(math.sin(pygame.time.get_ticks() * 0.005)))
+                color = image.get_at((15, 15))[:3] + (glow_alpha,)
+                target.blit(self.surface_cache.outline(sprite.get_size(), color, max(1, round(3 * zoom))), pos)
+        
+        for prev_center, center, color in snapshot.bullets:
+            center = camera.apply(lerp_pos(prev_center, center, alpha))
+            pygame.draw.circle(target, color, center, max(1, round(4 * zoom)))
+            pygame.draw.circle(target, (min(255, color[0]+100), min(255, color[1]+100), min(255, color[2]+100)), center, max(1, round(2 * zoom)))
+        
+        self.render_stats["zombies_drawn"] = len(snapshot.zombies)
+        for image, prev_pos, pos, health in snapshot.zombies:
+            draw_pos = camera.apply(lerp_pos(prev_pos, pos, alpha))
+            target.blit(scaled(image, zoom), draw_pos)
+            health_color = GREEN if health > 0.6 else YELLOW if health > 0.3 else RED
+            pygame.draw.rect(target, health_color, (draw_pos[0], draw_pos[1] - 10 * zoom, int(40 * zoom * health), max(1, 5 * zoom)))
+        
+        image, prev_pos, pos, width, dashing, dash_direction, invincible = snapshot.player
+        player_pos = lerp_pos(prev_pos, pos, alpha)
+        if dashing:
             for i in range(1, 6):
-                alpha = 255 - i * 40
-                size = self.player.rect.width - i * 2
-                pos = (
-                    self.player.rect.x + i * self.player.dash_direction[0] * 3,
-                    self.player.rect.y + i * self.player.dash_direction[1] * 3
-                )
-                s = pygame.Surface((size, size), pygame.SRCALPHA)
-                pygame.draw.rect(s, (*RED, alpha), (0, 0, size, size))
-                win.blit(s, pos)
-        
-        if not self.player.invincible or pygame.time.get_ticks() % 200 < 100:
-            win.blit(self.player.image, self.player.rect)
-        
-        self.particles.draw(win)
-        self.blood_particles.draw(win)
-        self.draw_ui()
-    
-    def draw_ui(self):
-        health_width = int(200 * (self.player.health / self.player.max_health))
-        health_color = GREEN if self.player.health > self.player.max_health * 0.6 else YELLOW if self.player.health > self.player.max_health * 0.3 else RED
+                size = int((width - i * 2) * zoom)
+                trail_pos = camera.apply((
+                    player_pos[0] + i * dash_direction[0] * 3,
+                    player_pos[1] + i * dash_direction[1] * 3
+                ))
+                target.blit(self.surface_cache.fill((size, size), (*RED, 255 - i * 40)), trail_pos)
+        
+        if not invincible or pygame.time.get_ticks() % 200 < 100:
+            target.blit(scaled(image, zoom), camera.apply(player_pos))
+        
+        self.render_stats["particles_drawn"] = draw_particles(target, snapshot.particles, camera.offset, zoom)
+        self.scaler.present(target, win)
+        self.draw_ui(snapshot.hud)
+    
+    def draw_ui(self, hud):
+        text = self.surface_cache.text
+        health_width = int(200 * (hud["health"] / hud["max_health"]))
+        health_color = GREEN if hud["health"] > hud["max_health"] * 0.6 else YELLOW if hud["health"] > hud["max_health"] * 0.3 else RED
         pygame.draw.rect(win, health_color, (20, 20, health_width, 25))
         pygame.draw.rect(win, WHITE, (20, 20, 200, 25), 2)
-        health_text = self.font_small.render(f"{int(self.player.health)}/{self.player.max_health}", True, WHITE)
+        health_text = text(self.font_small, f"{int(hud['health'])}/{hud['max_health']}", WHITE)
         win.blit(health_text, (120 - health_text.get_width()//2, 25 - health_text.get_height()//2))
         
-        weapon = self.player.get_weapon()
-        weapon_text = self.font_small.render(f"{weapon.name}: {weapon.ammo}/{weapon.max_ammo}", True, weapon.color)
+        weapon_text = text(self.font_small, hud["weapon"], hud["weapon_color"])
         win.blit(weapon_text, (20, 60))
         
-        if weapon.reload_timer > 0:
-            reload_width = int(100 * (1 - weapon.reload_timer / weapon.reload_time))
+        if hud["reload"] is not None:
+            reload_width = int(100 * hud["reload"])
             pygame.draw.rect(win, YELLOW, (20, 90, reload_width, 10))
             pygame.draw.rect(win, WHITE, (20, 90, 100, 10), 1)
         
-        score_text = self.font_small.render(f"SCORE: {self.player.score}", True, WHITE)
+        score_text = text(self.font_small, f"SCORE: {hud['score']}", WHITE)
         win.blit(score_text, (20, 120))
         
-        kills_text = self.font_small.render(f"KILLS: {self.player.kills}", True, WHITE)
+        kills_text = text(self.font_small, f"KILLS: {hud['kills']}", WHITE)
         win.blit(kills_text, (20, 150))
         
-        elapsed = (pygame.time.get_ticks() - self.start_ticks) / 1000
-        time_left = max(0, self.time_limit - elapsed)
-        mins, secs = divmod(int(time_left), 60)
-        time_text = self.font_small.render(f"TIME: {mins:02d}:{secs:02d}", True, WHITE)
+        mins, secs = divmod(int(hud["time_left"]), 60)
+        time_text = text(self.font_small, f"TIME: {mins:02d}:{secs:02d}", WHITE)
         win.blit(time_text, (WIDTH - 150, 20))
         
-        wave_text = self.font_small.render(f"WAVE: {self.wave}", True, WHITE)
+        wave_text = text(self.font_small, f"WAVE: {hud['wave']}", WHITE)
         win.blit(wave_text, (WIDTH - 150, 50))
         
-        if self.player.dash_cooldown > 0:
-            cooldown_width = int(100 * (1 - self.player.dash_cooldown / 60))
+        if hud["dash_cooldown"] > 0:
+            cooldown_width = int(100 * (1 - hud["dash_cooldown"] / 60))
             pygame.draw.rect(win, BLUE, (WIDTH - 120, 80, cooldown_width, 10))
             pygame.draw.rect(win, WHITE, (WIDTH - 120, 80, 100, 10), 1)
         
-        controls = self.font_small.render("WASD: Move | LMB: Shoot | SPACE: Dash | Q/E: Switch Weapon | R: Reload", True, (200, 200, 200))
+        controls = text(self.font_small, "WASD: Move | LMB: Shoot | SPACE: Dash | Q/E: Switch Weapon | R: Reload", (200, 200, 200))
         win.blit(controls, (WIDTH//2 - controls.get_width()//2, HEIGHT - 30))
     
     def draw_pause_screen(self):
-        overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 180))
-        win.blit(overlay, (0, 0))
+        win.blit(self.surface_cache.fill((WIDTH, HEIGHT), (0, 0, 0, 180)), (0, 0))
         
         pause = self.font_large.render("PAUSED", True, WHITE)
         win.blit(pause, (WIDTH//2 - pause.get_width()//2, HEIGHT//2 - 100))
@@ -877,9 +1785,7 @@ class ZombieEscape:
         win.blit(menu, (WIDTH//2 - menu.get_width()//2, HEIGHT//2 + 120))
     
     def draw_game_over(self):
-        overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 200))
-        win.blit(overlay, (0, 0))
+        win.blit(self.surface_cache.fill((WIDTH, HEIGHT), (0, 0, 0, 200)), (0, 0))
         
         game_over = self.font_large.render("GAME OVER", True, RED)
         win.blit(game_over, (WIDTH//2 - game_over.get_width()//2, HEIGHT//2 - 100))
@@ -890,7 +1796,7 @@ class ZombieEscape:
         kills = self.font_medium.render(f"Zombies Killed: {self.player.kills}", True, WHITE)
         win.blit(kills, (WIDTH//2 - kills.get_width()//2, HEIGHT//2 + 50))
         
-        time_survived = (pygame.time.get_ticks() - self.start_ticks) / 1000
+        time_survived = self.elapsed_seconds()
         mins, secs = divmod(int(time_survived), 60)
         time_text = self.font_medium.render(f"Time Survived: {mins:02d}:{secs:02d}", True, WHITE)
         win.blit(time_text, (WIDTH//2 - time_text.get_width()//2, HEIGHT//2 + 100))
@@ -902,9 +1808,7 @@ class ZombieEscape:
         win.blit(menu, (WIDTH//2 - menu.get_width()//2, HEIGHT//2 + 240))
     
     def draw_victory(self):
-        overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 200))
-        win.blit(overlay, (0, 0))
+        win.blit(self.surface_cache.fill((WIDTH, HEIGHT), (0, 0, 0, 200)), (0, 0))
         
         victory = self.font_large.render("VICTORY!", True, GREEN)
         win.blit(victory, (WIDTH//2 - victory.get_width()//2, HEIGHT//2 - 100))
@@ -924,35 +1828,157 @@ class ZombieEscape:
         menu = self.font_medium.render("Press M for menu", True, WHITE)
         win.blit(menu, (WIDTH//2 - menu.get_width()//2, HEIGHT//2 + 240))
     
-    def draw(self):
-        if self.state == USERNAME:
+    def draw(self, snapshot=None, alpha=None):
+        state = self.state if snapshot is None else snapshot.state
+        if state == USERNAME:
             self.draw_username_screen()
-        elif self.state == ACCESS_GRANTED:
+        elif state == ACCESS_GRANTED:
             self.draw_access_granted()
-        elif self.state == MENU:
+        elif state == MENU:
             self.draw_menu()
-        elif self.state == PLAYING:
-            self.draw_game()
-        elif self.state == PAUSED:
-            self.draw_game()
+        elif state == PLAYING:
+            self.draw_game(snapshot, alpha)
+        elif state == PAUSED:
+            self.draw_game(snapshot, alpha)
             self.draw_pause_screen()
-        elif self.state == GAME_OVER:
-            self.draw_game()
+        elif state == GAME_OVER:
+            self.draw_game(snapshot, alpha)
             self.draw_game_over()
-        elif self.state == VICTORY:
-            self.draw_game()
+        elif state == VICTORY:
+            self.draw_game(snapshot, alpha)
             self.draw_victory()
-        elif self.state == INSTRUCTIONS:
+        elif state == INSTRUCTIONS:
             self.draw_instructions()
+        
+        if self.diagnostics and self.diagnostics.visible:
+            self.diagnostics.draw(win, self)
     
-    def run(self):
-        while True:
-            self.handle_events()
+    def frame(self):
+        self.handle_events()
+        self.pacer.tick()
+        start = time.perf_counter()
+        for _ in self.pacer.steps():
             self.update()
-            self.draw()
-            pygame.display.flip()
-            self.clock.tick(60)
+        self.events.drain()
+        self.draw()
+        self.scaler.adapt((time.perf_counter() - start) * 1000, 1000 / (self.pacer.fps or SIM_RATE))
+        pygame.display.flip()
+    
+    def simulate(self):
+        # Worker thread: input, fixed-rate updates and events, then publish a snapshot
+        step = 1 / SIM_RATE
+        next_tick = time.perf_counter()
+        try:
+            while not self.stopping:
+                with self.input_lock:
+                    events, self.input_events = self.input_events, []
+                self.handle_events(events)
+                steps = 0
+                while time.perf_counter() >= next_tick and steps < MAX_SIM_STEPS:
+                    self.update()
+                    next_tick += step
+                    steps += 1
+                if steps == MAX_SIM_STEPS:
+                    next_tick = max(next_tick, time.perf_counter())
+                self.events.drain()
+                if steps or events:
+                    self.snapshots.publish(self.capture())
+                time.sleep(max(0, next_tick - time.perf_counter()))
+        except Exception as error:
+            self.sim_error = error
+    
+    def start_pipeline(self):
+        self.snapshots = SnapshotBuffer()
+        self.snapshots.publish(self.capture())
+        self.stopping = False
+        self.sim_error = None
+        self.sim_thread = threading.Thread(target=self.simulate, name="simulation", daemon=True)
+        self.sim_thread.start()
+    
+    def stop_pipeline(self):
+        if self.sim_thread:
+            self.stopping = True
+            self.sim_thread.join()
+            self.sim_thread = None
+    
+    def pipelined_frame(self):
+        # Main thread: pump the window and draw the latest snapshot while the next tick runs
+        events = pygame.event.get()
+        if any(event.type == pygame.QUIT for event in events):
+            self.quit_game()
+        with self.input_lock:
+            self.input_events.extend(events)
+        self.pacer.wait()
+        start = time.perf_counter()
+        snapshot = self.snapshots.swap()
+        alpha = min(1.0, (time.perf_counter() - snapshot.time) * SIM_RATE)
+        self.draw(snapshot, alpha)
+        self.scaler.adapt((time.perf_counter() - start) * 1000, 1000 / (self.pacer.fps or SIM_RATE))
+        pygame.display.flip()
+        if not self.sim_thread.is_alive():
+            if self.sim_error:
+                raise self.sim_error
+            self.sim_thread = None
+            self.quit_game()
+    
+    def run(self, pipelined=False):
+        if not pipelined:
+            while True:
+                self.frame()
+        self.start_pipeline()
+        while True:
+            self.pipelined_frame()
+
+def parse_resolution(value):
+    if value == "native":
+        return pygame.display.get_desktop_sizes()[0]
+    try:
+        width, height = (int(part) for part in value.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected WIDTHxHEIGHT or native, got {value!r}")
+    return width, height
+
+def parse_render_scale(value):
+    if value == "adaptive":
+        return value
+    try:
+        scale = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a scale or adaptive, got {value!r}")
+    if not 0.25 <= scale <= 1.0:
+        raise argparse.ArgumentTypeError("render scale must be between 0.25 and 1.0")
+    return scale
 
 if __name__ == "__main__":
-    game = ZombieEscape()
-    game.run()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Ultimate Zombie Escape")
+    parser.add_argument("--resolution", type=parse_resolution, default=(WIDTH, HEIGHT), metavar="WxH",
+                        help="window size, e.g. 1920x1080, or native for the desktop size")
+    parser.add_argument("--render-scale", type=parse_render_scale, default=1.0, metavar="SCALE",
+                        help="draw the world at this fraction of the window size (0.25-1.0) or adaptive")
+    parser.add_argument("--fps", choices=PACING_MODES, default="60",
+                        help="frame pacing: uncapped, a fixed cap, or adaptive (vsync when available)")
+    parser.add_argument("--telemetry", metavar="DIR",
+                        help="record gameplay telemetry to rotating compressed logs in DIR")
+    parser.add_argument("--bot", choices=list(BOT_PROFILES),
+                        help="let a bot play with the given difficulty profile")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="run the simulation on a worker thread while the main thread renders")
+    parser.add_argument("--diagnostics", metavar="FILE", nargs="?", const="diagnostics.json",
+                        help="track entity counts and allocations per round (F3 overlay, F4 dump to FILE)")
+    args = parser.parse_args()
+    open_display(args.resolution)
+    recorder = None
+    if args.telemetry:
+        from telemetry import TelemetryRecorder
+        recorder = TelemetryRecorder(args.telemetry)
+    diagnostics = None
+    if args.diagnostics:
+        from diagnostics import Diagnostics
+        diagnostics = Diagnostics(args.diagnostics)
+    controller = BotController(args.bot) if args.bot else None
+    game = ZombieEscape(args.fps, telemetry=recorder, controller=controller, diagnostics=diagnostics,
+                        render_scale=args.render_scale)
+    if args.bot:
+        game.username = f"BOT-{args.bot.upper()}"
+        game.begin_playing()
+    game.run(args.pipeline)
\ No newline at end of file
@@ -0,0 +1,177 @@
+"""Heatmaps over recorded Ultimate Zombie Escape sessions.
+
+Reads telemetry logs written by `python game.py --telemetry DIR`, bins event
+positions into 2D histograms with NumPy and renders each layer as a PNG over
+the map the rounds were played on.
+
+    python heatmap.py logs/ --out heatmaps/
+    python heatmap.py logs/ --layer deaths --cell 25 --size 2048
+"""
+import os
+import time
+import argparse
+
+import numpy as np
+
+import telemetry
+
+RECORD_DTYPE = np.dtype([
+    ("time_ms", "<u4"),
+    ("tick", "<u4"),
+    ("kind", "<u2"),
+    ("detail", "<u2"),
+    ("x", "<i4"),
+    ("y", "<i4"),
+    ("value", "<u4")
+])
+
+# Layer name -> event kinds whose positions it counts
+LAYERS = {
+    "deaths": ["player_died"],
+    "breakthroughs": ["player_hit"],
+    "kills": ["zombie_killed"],
+    "unused-supplies": ["supply_spawned"]
+}
+
+
+class Histograms:
+    def __init__(self, bounds, cell, seed=None):
+        self.left, self.top, self.width, self.height = bounds
+        self.cell = cell
+        self.bins_x = -(-self.width // cell)
+        self.bins_y = -(-self.height // cell)
+        self.seed = seed
+        self.current_seed = None
+        self.seeds = {}
+        self.counts = {kind: np.zeros(self.bins_x * self.bins_y, dtype=np.int64)
+                       for kind in ("player_died", "player_hit", "zombie_killed",
+                                    "supply_spawned", "supply_collected")}
+        self.codes = {telemetry.EVENT_CODES[kind]: kind for kind in self.counts}
+        self.round_code = telemetry.EVENT_CODES["round_started"]
+        self.records = 0
+
+    def round_seeds(self, records):
+        # Forward-fill the seed of the most recent round_started onto every record
+        starts = records["kind"] == self.round_code
+        index = np.where(starts, np.arange(len(records)), -1)
+        np.maximum.accumulate(index, out=index)
+        seeds = np.where(index >= 0, records["value"][np.maximum(index, 0)],
+                         -1 if self.current_seed is None else self.current_seed).astype(np.int64)
+        if starts.any():
+            self.current_seed = int(records["value"][starts][-1])
+            values, counts = np.unique(records["value"][starts], return_counts=True)
+            for value, count in zip(values.tolist(), counts.tolist()):
+                self.seeds[value] = self.seeds.get(value, 0) + count
+        return seeds
+
+    def add(self, chunk):
+        records = np.frombuffer(chunk, dtype=RECORD_DTYPE)
+        self.records += len(records)
+        seeds = self.round_seeds(records)
+        bx = (records["x"] - self.left) // self.cell
+        by = (records["y"] - self.top) // self.cell
+        keep = (bx >= 0) & (bx < self.bins_x) & (by >= 0) & (by < self.bins_y)
+        if self.seed is not None:
+            keep &= seeds == self.seed
+        flat = by * self.bins_x + bx
+        for code, kind in self.codes.items():
+            mask = keep & (records["kind"] == code)
+            if mask.any():
+                self.counts[kind] += np.bincount(flat[mask], minlength=len(self.counts[kind]))
+
+    def layer(self, name):
+        if name == "unused-supplies":
+            grid = np.clip(self.counts["supply_spawned"] - self.counts["supply_collected"], 0, None)
+        else:
+            grid = sum(self.counts[kind] for kind in LAYERS[name])
+        return grid.reshape(self.bins_y, self.bins_x)
+
+
+def heat_colors(grid):
+    # Log-scaled "hot" ramp: transparent -> red -> yellow -> white
+    heat = np.log1p(grid.astype(np.float64))
+    if heat.max() > 0:
+        heat /= heat.max()
+    rgba = np.zeros(grid.shape + (4,), dtype=np.uint8)
+    rgba[..., 0] = np.clip(heat * 3, 0, 1) * 255
+    rgba[..., 1] = np.clip(heat * 3 - 1, 0, 1) * 255
+    rgba[..., 2] = np.clip(heat * 3 - 2, 0, 1) * 255
+    rgba[..., 3] = np.where(grid > 0, 90 + heat * 165, 0)
+    return rgba
+
+
+def render_background(game, bounds, seed, scale):
+    pygame = game.pygame
+    left, top, width, height = bounds
+    size = (max(1, int(width * scale)), max(1, int(height * scale)))
+    background = pygame.Surface(size)
+    background.fill(game.DARK_GRAY)
+    if seed is None:
+        return background
+    world = game.ChunkWorld(game.load_assets(), seed)
+    chunk_px = max(1, int(round(game.CHUNK_SIZE * scale)))
+    for cx, cy in world.chunk_range(pygame.Rect(bounds)):
+        surface = pygame.transform.smoothscale(world.get_chunk(cx, cy).surface, (chunk_px, chunk_px))
+        background.blit(surface, (int((cx * game.CHUNK_SIZE - left) * scale),
+                                  int((cy * game.CHUNK_SIZE - top) * scale)))
+    return background
+
+
+def render(game, histograms, name, background, path):
+    pygame = game.pygame
+    grid = histograms.layer(name)
+    rgba = heat_colors(grid)
+    overlay = pygame.image.frombuffer(rgba.tobytes(), (histograms.bins_x, histograms.bins_y), "RGBA")
+    image = background.copy()
+    image.blit(pygame.transform.smoothscale(overlay, image.get_size()), (0, 0))
+    pygame.image.save(image, path)
+    return grid
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render heatmaps from telemetry logs")
+    parser.add_argument("paths", nargs="+", help="telemetry log files or directories")
+    parser.add_argument("--layer", choices=list(LAYERS) + ["all"], default="all")
+    parser.add_argument("--out", default="heatmaps")
+    parser.add_argument("--cell", type=int, default=50, help="histogram bin size in world pixels")
+    parser.add_argument("--size", type=int, default=1024, help="longest side of the output image")
+    parser.add_argument("--seed", type=int, help="only count rounds played on this map seed")
+    parser.add_argument("--region", type=int, nargs=4, metavar=("X", "Y", "W", "H"),
+                        help="world region to plot (default: the whole world)")
+    parser.add_argument("--top", type=int, default=5, help="print the busiest bins per layer")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    import game
+
+    bounds = tuple(args.region) if args.region else (0, 0, game.WORLD_WIDTH, game.WORLD_HEIGHT)
+    histograms = Histograms(bounds, args.cell, args.seed)
+    start = time.perf_counter()
+    for chunk in telemetry.iter_chunks(args.paths):
+        histograms.add(chunk)
+    elapsed = time.perf_counter() - start
+    print(f"binned {histograms.records} records in {elapsed:.2f}s")
+
+    seed = args.seed
+    if seed is None and histograms.seeds:
+        seed = max(histograms.seeds, key=histograms.seeds.get)
+    scale = args.size / max(bounds[2], bounds[3])
+    background = render_background(game, bounds, seed, scale)
+
+    os.makedirs(args.out, exist_ok=True)
+    layers = list(LAYERS) if args.layer == "all" else [args.layer]
+    for name in layers:
+        path = os.path.join(args.out, f"{name}.png")
+        grid = render(game, histograms, name, background, path)
+        print(f"{name}: {int(grid.sum())} events -> {path}")
+        flat = grid.ravel()
+        for index in np.argsort(flat)[::-1][:args.top]:
+            if flat[index] == 0:
+                break
+            by, bx = divmod(int(index), histograms.bins_x)
+            print(f"  ({bounds[0] + bx * args.cell}, {bounds[1] + by * args.cell}) {int(flat[index])}")
+
+
+if __name__ == "__main__":
+    main()
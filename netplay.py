@@ -0,0 +1,694 @@
+"""Local networked co-op for Ultimate Zombie Escape.
+
+The server owns the simulation and runs headless on asyncio UDP. Clients send
+their inputs every tick, predict their own player locally and reconcile
+against the delta-compressed snapshots the server sends back.
+
+    python netplay.py server --port 47800
+    python netplay.py client --host 127.0.0.1 --name alice
+    python netplay.py local --clients 4 --seconds 10
+"""
+import os
+import math
+import time
+import random
+import struct
+import asyncio
+import argparse
+import itertools
+from collections import OrderedDict
+
+game = None
+
+DEFAULT_PORT = 47800
+TICK_RATE = 60
+SNAPSHOT_EVERY = 2
+MAX_PLAYERS = 4
+MAX_PACKET = 1200
+CLIENT_TIMEOUT = 5.0
+HISTORY = 32
+RESPAWN_TICKS = 180
+
+MAGIC = 0x5A
+MSG_HELLO = 1
+MSG_WELCOME = 2
+MSG_INPUT = 3
+MSG_SNAPSHOT = 4
+MSG_BYE = 5
+
+BTN_FIRE = 1
+BTN_DASH = 2
+BTN_RELOAD = 4
+BTN_PREV = 8
+BTN_NEXT = 16
+
+KIND_PLAYER = 0
+KIND_BULLET = 5
+ZOMBIE_KINDS = {"normal": 1, "fast": 2, "tank": 3, "boss": 4}
+
+FLAG_NEW = 1
+FLAG_POS_DELTA = 2
+FLAG_POS_FULL = 4
+FLAG_HEALTH = 8
+
+HEADER = struct.Struct("<BB")
+HELLO = struct.Struct("<BB16s")
+WELCOME = struct.Struct("<BBHBBI")
+INPUT = struct.Struct("<BBIB")
+INPUT_CMD = struct.Struct("<IbbiiB")
+SNAPSHOT = struct.Struct("<BBIIHIBBBIHHH")
+ENTITY = struct.Struct("<HB")
+KIND = struct.Struct("<B")
+POS_FULL = struct.Struct("<ii")
+POS_DELTA = struct.Struct("<bb")
+HEALTH = struct.Struct("<B")
+REMOVED = struct.Struct("<H")
+
+
+def import_game(headless):
+    global game
+    if game is None:
+        if headless:
+            os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+            os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+        import game as game_module
+        game = game_module
+    return game
+
+
+def quantize_health(health, max_health):
+    return max(0, min(100, math.ceil(100 * health / max_health)))
+
+
+def apply_move(player, dx, dy):
+    # Shared by the server and client prediction so both integrate identically
+    if not player.dashing:
+        if dx != 0 and dy != 0:
+            dx *= 0.7071
+            dy *= 0.7071
+        player.rect.x += dx * player.speed
+        player.rect.y += dy * player.speed
+    player.update()
+
+
+def encode_snapshot(tick, baseline_tick, baseline, entities, header, budget=MAX_PACKET):
+    # Entities are (net_id, kind, x, y, health) in priority order. Anything that
+    # doesn't fit the budget keeps its baseline value in the returned state, so
+    # the next delta picks it up again.
+    sent = dict(baseline)
+    body = bytearray()
+    updates = 0
+    room = budget - SNAPSHOT.size
+
+    current_ids = set()
+    for net_id, kind, x, y, health in entities:
+        current_ids.add(net_id)
+        old = baseline.get(net_id)
+        flags = 0
+        if old is None:
+            flags = FLAG_NEW | FLAG_POS_FULL | FLAG_HEALTH
+        else:
+            dx, dy = x - old[1], y - old[2]
+            if dx or dy:
+                flags |= FLAG_POS_DELTA if -128 <= dx <= 127 and -128 <= dy <= 127 else FLAG_POS_FULL
+            if health != old[3]:
+                flags |= FLAG_HEALTH
+            if not flags:
+                continue
+
+        size = ENTITY.size
+        size += KIND.size if flags & FLAG_NEW else 0
+        size += POS_FULL.size if flags & FLAG_POS_FULL else POS_DELTA.size if flags & FLAG_POS_DELTA else 0
+        size += HEALTH.size if flags & FLAG_HEALTH else 0
+        if size > room:
+            continue
+
+        body += ENTITY.pack(net_id, flags)
+        if flags & FLAG_NEW:
+            body += KIND.pack(kind)
+        if flags & FLAG_POS_FULL:
+            body += POS_FULL.pack(x, y)
+        elif flags & FLAG_POS_DELTA:
+            body += POS_DELTA.pack(x - old[1], y - old[2])
+        if flags & FLAG_HEALTH:
+            body += HEALTH.pack(health)
+        room -= size
+        updates += 1
+        sent[net_id] = (kind, x, y, health)
+
+    removed = 0
+    for net_id in baseline:
+        if net_id not in current_ids and room >= REMOVED.size:
+            body += REMOVED.pack(net_id)
+            room -= REMOVED.size
+            removed += 1
+            del sent[net_id]
+
+    packet = SNAPSHOT.pack(MAGIC, MSG_SNAPSHOT, tick, baseline_tick, *header, updates, removed) + body
+    return packet, sent
+
+
+def decode_snapshot(packet, baselines):
+    fields = SNAPSHOT.unpack_from(packet)
+    tick, baseline_tick = fields[2], fields[3]
+    header = fields[4:11]
+    updates, removed = fields[11], fields[12]
+    if baseline_tick:
+        if baseline_tick not in baselines:
+            return None
+        state = dict(baselines[baseline_tick])
+    else:
+        state = {}
+
+    offset = SNAPSHOT.size
+    for _ in range(updates):
+        net_id, flags = ENTITY.unpack_from(packet, offset)
+        offset += ENTITY.size
+        kind, x, y, health = state.get(net_id, (0, 0, 0, 0))
+        if flags & FLAG_NEW:
+            kind, = KIND.unpack_from(packet, offset)
+            offset += KIND.size
+        if flags & FLAG_POS_FULL:
+            x, y = POS_FULL.unpack_from(packet, offset)
+            offset += POS_FULL.size
+        elif flags & FLAG_POS_DELTA:
+            dx, dy = POS_DELTA.unpack_from(packet, offset)
+            x, y = x + dx, y + dy
+            offset += POS_DELTA.size
+        if flags & FLAG_HEALTH:
+            health, = HEALTH.unpack_from(packet, offset)
+            offset += HEALTH.size
+        state[net_id] = (kind, x, y, health)
+
+    for _ in range(removed):
+        net_id, = REMOVED.unpack_from(packet, offset)
+        offset += REMOVED.size
+        state.pop(net_id, None)
+
+    return tick, header, state
+
+
+class NetPlayer:
+    def __init__(self, net_id, addr, name, player):
+        self.net_id = net_id
+        self.addr = addr
+        self.name = name
+        self.player = player
+        self.commands = []
+        self.last_seq = 0
+        self.processed_seq = 0
+        self.last_command = (0, 0, 0, 0, 0, 0)
+        self.acked_tick = 0
+        self.history = OrderedDict()
+        self.last_heard = time.monotonic()
+        self.respawn_timer = 0
+
+
+class ServerWorld:
+    def __init__(self, seed=None):
+        self.assets = game.load_assets()
+        self.seed = random.randrange(2**32) if seed is None else seed
+        self.director = game.WaveDirector(self.seed)
+        self.ids = itertools.count(1)
+        self.players = {}
+        self.zombies = []
+        self.bullets = []
+        self.grid = game.SpatialGrid()
+        self.tick = 0
+
+    def add_player(self, addr, name):
+        if addr not in self.players and len(self.players) < MAX_PLAYERS:
+            player = game.Player(self.assets)
+            self.players[addr] = NetPlayer(next(self.ids), addr, name, player)
+        return self.players.get(addr)
+
+    def remove_player(self, addr):
+        self.players.pop(addr, None)
+
+    def queue_commands(self, addr, commands):
+        net_player = self.players.get(addr)
+        if net_player is None:
+            return
+        net_player.last_heard = time.monotonic()
+        for command in commands:
+            if command[0] > net_player.last_seq:
+                net_player.commands.append(command)
+                net_player.last_seq = command[0]
+
+    def run_command(self, net_player, command):
+        _, dx, dy, aim_x, aim_y, buttons = command
+        player = net_player.player
+        if buttons & BTN_DASH and (dx or dy):
+            player.dash([dx, dy])
+        if buttons & BTN_RELOAD:
+            player.get_weapon().reload()
+        if buttons & BTN_PREV:
+            player.switch_weapon(-1)
+        if buttons & BTN_NEXT:
+            player.switch_weapon(1)
+        apply_move(player, dx, dy)
+        if buttons & BTN_FIRE:
+            weapon = player.get_weapon()
+            if weapon.can_fire():
+                for bullet in weapon.fire(player.rect.center, (aim_x, aim_y)):
+                    bullet.net_id = next(self.ids)
+                    bullet.owner = id(player)
+                    self.bullets.append(bullet)
+            elif weapon.ammo <= 0:
+                weapon.reload()
+
+    def step(self):
+        self.tick += 1
+        alive = [p for p in self.players.values() if p.player.health > 0]
+
+        for net_player in self.players.values():
+            if net_player.player.health <= 0:
+                net_player.respawn_timer -= 1
+                if net_player.respawn_timer <= 0:
+                    score, kills = net_player.player.score, net_player.player.kills
+                    net_player.player = game.Player(self.assets)
+                    net_player.player.score, net_player.player.kills = score, kills
+                continue
+            # Run one command per tick; drain faster when a client falls behind
+            count = 1 if len(net_player.commands) <= 4 else len(net_player.commands) - 3
+            if net_player.commands:
+                for command in net_player.commands[:count]:
+                    self.run_command(net_player, command)
+                    net_player.last_command = command
+                    net_player.processed_seq = command[0]
+                del net_player.commands[:count]
+            else:
+                # Repeat held movement and fire, but never one-shot buttons
+                seq, dx, dy, aim_x, aim_y, buttons = net_player.last_command
+                self.run_command(net_player, (seq, dx, dy, aim_x, aim_y, buttons & BTN_FIRE))
+
+        if not alive:
+            return
+
+        for zombie_type, side, burst in self.director.update(len(self.zombies)):
+            view = self.view_around(random.choice(alive).player)
+            for _ in range(burst):
+                x, y = game.edge_spawn_position(side, view)
+                zombie = game.Zombie(x, y, zombie_type, self.assets)
+                zombie.net_id = next(self.ids)
+                self.zombies.append(zombie)
+
+        for zombie in self.zombies:
+            target = min(alive, key=lambda p: (p.player.rect.centerx - zombie.rect.centerx) ** 2 +
+                                              (p.player.rect.centery - zombie.rect.centery) ** 2).player
+            dx = target.rect.centerx - zombie.rect.centerx
+            dy = target.rect.centery - zombie.rect.centery
+            dist = max(1, math.sqrt(dx*dx + dy*dy))
+            zombie.rect.x += (dx / dist) * zombie.speed
+            zombie.rect.y += (dy / dist) * zombie.speed
+        self.grid.rebuild(self.zombies)
+
+        owners = {id(p.player): p for p in alive}
+        for bullet in self.bullets[:]:
+            if bullet.update():
+                self.bullets.remove(bullet)
+                continue
+            for zombie in self.grid.query(bullet.rect):
+                if zombie.health > 0 and bullet.rect.colliderect(zombie.rect):
+                    zombie.health -= bullet.damage
+                    if zombie.health <= 0:
+                        self.zombies.remove(zombie)
+                        shooter = owners.get(getattr(bullet, "owner", None))
+                        if shooter:
+                            shooter.player.kills += 1
+                            shooter.player.score += zombie.score_value
+                    self.bullets.remove(bullet)
+                    break
+
+        for net_player in alive:
+            player = net_player.player
+            if player.invincible or player.dashing:
+                continue
+            for zombie in self.grid.query(player.rect):
+                if zombie.health > 0 and player.rect.colliderect(zombie.rect):
+                    player.health -= zombie.damage
+                    player.invincible = True
+                    player.invincible_timer = game.INVINCIBLE_TICKS
+                    dx = player.rect.centerx - zombie.rect.centerx
+                    dy = player.rect.centery - zombie.rect.centery
+                    dist = max(1, math.sqrt(dx*dx + dy*dy))
+                    knockback = 20 * (1 - zombie.knockback_resistance)
+                    player.rect.x += (dx / dist) * knockback
+                    player.rect.y += (dy / dist) * knockback
+                    if player.health <= 0:
+                        net_player.respawn_timer = RESPAWN_TICKS
+                    break
+
+    def view_around(self, player):
+        view = game.pygame.Rect((0, 0), game.view_size())
+        view.center = player.rect.center
+        return view
+
+    def entities_for(self, net_player):
+        entities = []
+        for other in self.players.values():
+            player = other.player
+            entities.append((other.net_id, KIND_PLAYER, player.rect.centerx, player.rect.centery,
+                             quantize_health(player.health, player.max_health)))
+        cx, cy = net_player.player.rect.center
+        aoi = self.view_around(net_player.player).inflate(game.AOI_MARGIN * 2, game.AOI_MARGIN * 2)
+        # Nearest first, so a full packet drops the far edge of the horde
+        zombies = sorted((z for z in self.grid.query(aoi, 0) if z.health > 0),
+                         key=lambda z: abs(z.rect.centerx - cx) + abs(z.rect.centery - cy))
+        for zombie in zombies:
+            entities.append((zombie.net_id, ZOMBIE_KINDS[zombie.type], zombie.rect.centerx, zombie.rect.centery,
+                             quantize_health(zombie.health, zombie.max_health)))
+        for bullet in self.bullets:
+            if aoi.collidepoint(bullet.rect.center):
+                entities.append((bullet.net_id, KIND_BULLET, bullet.rect.centerx, bullet.rect.centery, 0))
+        return entities
+
+    def snapshot_for(self, net_player):
+        baseline = net_player.history.get(net_player.acked_tick)
+        baseline_tick = net_player.acked_tick if baseline is not None else 0
+        player = net_player.player
+        weapon = player.get_weapon()
+        header = (net_player.net_id, net_player.processed_seq, quantize_health(player.health, player.max_health),
+                  player.current_weapon, min(255, weapon.ammo), player.score, min(65535, player.kills))
+        packet, sent = encode_snapshot(self.tick, baseline_tick, baseline or {}, self.entities_for(net_player), header)
+        net_player.history[self.tick] = sent
+        while len(net_player.history) > HISTORY:
+            net_player.history.popitem(last=False)
+        return packet
+
+
+class ServerProtocol(asyncio.DatagramProtocol):
+    def __init__(self, world):
+        self.world = world
+        self.transport = None
+        self.bytes_sent = 0
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        if len(data) < HEADER.size:
+            return
+        magic, msg = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            return
+        if msg == MSG_HELLO and len(data) >= HELLO.size:
+            name = HELLO.unpack_from(data)[2].rstrip(b"\0").decode("utf-8", "replace")
+            net_player = self.world.add_player(addr, name)
+            if net_player:
+                self.transport.sendto(WELCOME.pack(MAGIC, MSG_WELCOME, net_player.net_id, TICK_RATE, SNAPSHOT_EVERY,
+                                                 self.world.seed), addr)
+        elif msg == MSG_INPUT and len(data) >= INPUT.size:
+            _, _, acked_tick, count = INPUT.unpack_from(data)
+            commands = [INPUT_CMD.unpack_from(data, INPUT.size + i * INPUT_CMD.size)
+                        for i in range(count) if INPUT.size + (i + 1) * INPUT_CMD.size <= len(data)]
+            net_player = self.world.players.get(addr)
+            if net_player:
+                net_player.acked_tick = max(net_player.acked_tick, acked_tick)
+                self.world.queue_commands(addr, sorted(commands))
+        elif msg == MSG_BYE:
+            self.world.remove_player(addr)
+
+    def broadcast(self):
+        now = time.monotonic()
+        for addr, net_player in list(self.world.players.items()):
+            if now - net_player.last_heard > CLIENT_TIMEOUT:
+                self.world.remove_player(addr)
+                continue
+            packet = self.world.snapshot_for(net_player)
+            self.bytes_sent += len(packet)
+            self.transport.sendto(packet, addr)
+
+
+async def run_server(host, port, seconds=None, seed=None):
+    world = ServerWorld(seed)
+    loop = asyncio.get_running_loop()
+    transport, protocol = await loop.create_datagram_endpoint(lambda: ServerProtocol(world), local_addr=(host, port))
+    step = 1 / TICK_RATE
+    next_tick = loop.time()
+    end = None if seconds is None else loop.time() + seconds
+    try:
+        while end is None or loop.time() < end:
+            world.step()
+            if world.tick % SNAPSHOT_EVERY == 0:
+                protocol.broadcast()
+            next_tick += step
+            await asyncio.sleep(max(0, next_tick - loop.time()))
+    finally:
+        transport.close()
+    return world, protocol
+
+
+class ClientProtocol(asyncio.DatagramProtocol):
+    def __init__(self, name):
+        self.name = name
+        self.transport = None
+        self.net_id = None
+        self.seed = None
+        self.baselines = OrderedDict()
+        self.latest_tick = 0
+        self.header = None
+        self.state = {}
+        self.bytes_received = 0
+        self.snapshots = 0
+        self.welcomed = asyncio.Event()
+
+    def connection_made(self, transport):
+        self.transport = transport
+        transport.sendto(HELLO.pack(MAGIC, MSG_HELLO, self.name.encode("utf-8")[:16]))
+
+    def datagram_received(self, data, addr):
+        if len(data) < HEADER.size:
+            return
+        magic, msg = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            return
+        if msg == MSG_WELCOME:
+            fields = WELCOME.unpack_from(data)
+            self.net_id, self.seed = fields[2], fields[5]
+            self.welcomed.set()
+        elif msg == MSG_SNAPSHOT:
+            self.bytes_received += len(data)
+            decoded = decode_snapshot(data, self.baselines)
+            if decoded is None or decoded[0] <= self.latest_tick:
+                return
+            self.latest_tick, self.header, self.state = decoded
+            self.snapshots += 1
+            self.baselines[self.latest_tick] = self.state
+            while len(self.baselines) > HISTORY:
+                self.baselines.popitem(last=False)
+
+    def send_commands(self, commands):
+        packet = INPUT.pack(MAGIC, MSG_INPUT, self.latest_tick, len(commands))
+        packet += b"".join(INPUT_CMD.pack(*command) for command in commands)
+        self.transport.sendto(packet)
+
+    def close(self):
+        if self.transport:
+            self.transport.sendto(HEADER.pack(MAGIC, MSG_BYE))
+            self.transport.close()
+
+
+def save_timers(player):
+    return (player.dashing, player.dash_timer, player.dash_cooldown, list(player.dash_direction),
+            player.invincible, player.invincible_timer, player.speed, player.speed_boost_timer,
+            [(weapon.ammo, weapon.fire_timer, weapon.reload_timer) for weapon in player.weapons])
+
+
+def restore_timers(player, timers):
+    (player.dashing, player.dash_timer, player.dash_cooldown, dash_direction,
+     player.invincible, player.invincible_timer, player.speed, player.speed_boost_timer, weapons) = timers
+    player.dash_direction = list(dash_direction)
+    for weapon, (ammo, fire_timer, reload_timer) in zip(player.weapons, weapons):
+        weapon.ammo = ammo
+        weapon.fire_timer = fire_timer
+        weapon.reload_timer = reload_timer
+
+
+class PredictedPlayer:
+    def __init__(self, assets):
+        self.player = game.Player(assets)
+        self.pending = []
+        # Player timers as they were just before each pending command ran
+        self.timers = {}
+        self.seq = 0
+        self.acked_seq = 0
+
+    def step(self, command):
+        _, dx, dy, _, _, buttons = command
+        if buttons & BTN_DASH and (dx or dy):
+            self.player.dash([dx, dy])
+        apply_move(self.player, dx, dy)
+
+    def command(self, dx, dy, aim, buttons):
+        self.seq += 1
+        command = (self.seq, dx, dy, int(aim[0]), int(aim[1]), buttons)
+        self.pending.append(command)
+        self.timers[self.seq] = save_timers(self.player)
+        self.step(command)
+        return command
+
+    def reconcile(self, protocol):
+        if protocol.header is None or protocol.header[1] == self.acked_seq:
+            return
+        server = protocol.state.get(protocol.net_id)
+        if server is None:
+            return
+        self.acked_seq = protocol.header[1]
+        self.pending = [command for command in self.pending if command[0] > self.acked_seq]
+        self.timers = {seq: timers for seq, timers in self.timers.items() if seq > self.acked_seq}
+        # Rewind to the authoritative position and replay inputs the server hasn't seen yet.
+        # Timers rewind to where they stood before the first replayed command, so replaying
+        # ends exactly where live prediction left them instead of ticking them again.
+        self.player.rect.center = (server[1], server[2])
+        if self.pending:
+            restore_timers(self.player, self.timers[self.pending[0][0]])
+        for command in self.pending:
+            self.step(command)
+
+
+async def connect(host, port, name):
+    loop = asyncio.get_running_loop()
+    _, protocol = await loop.create_datagram_endpoint(lambda: ClientProtocol(name), remote_addr=(host, port))
+    await asyncio.wait_for(protocol.welcomed.wait(), 5)
+    return protocol
+
+
+async def run_headless_client(host, port, name, seconds):
+    assets = game.load_assets()
+    protocol = await connect(host, port, name)
+    predicted = PredictedPlayer(assets)
+    loop = asyncio.get_running_loop()
+    step = 1 / TICK_RATE
+    next_tick = loop.time()
+    end = loop.time() + seconds
+    rng = random.Random(name)
+    dx, dy = 0, 0
+    while loop.time() < end:
+        if rng.random() < 0.05:
+            dx, dy = rng.choice((-1, 0, 1)), rng.choice((-1, 0, 1))
+        px, py = predicted.player.rect.center
+        zombies = [e for e in protocol.state.values() if KIND_PLAYER < e[0] < KIND_BULLET]
+        aim = min(((e[1], e[2]) for e in zombies), key=lambda p: (p[0] - px) ** 2 + (p[1] - py) ** 2,
+                  default=(px + 1, py))
+        predicted.command(dx, dy, aim, BTN_FIRE)
+        protocol.send_commands(predicted.pending[-3:])
+        predicted.reconcile(protocol)
+        next_tick += step
+        await asyncio.sleep(max(0, next_tick - loop.time()))
+    protocol.close()
+    return protocol
+
+
+async def run_client(host, port, name):
+    pygame = game.pygame
+    assets = game.load_assets()
+    protocol = await connect(host, port, name)
+    predicted = PredictedPlayer(assets)
+    font = pygame.font.Font(None, 36)
+    world = game.ChunkWorld(assets, protocol.seed)
+    camera = game.Camera(*game.view_size(), world.bounds, game.HEIGHT / game.VIEW_HEIGHT)
+    surface_cache = game.SurfaceCache()
+    images = {kind: assets[f"zombie_{zombie_type}"] for zombie_type, kind in ZOMBIE_KINDS.items()}
+    images[KIND_PLAYER] = assets["player"]
+    loop = asyncio.get_running_loop()
+    step = 1 / TICK_RATE
+    next_tick = loop.time()
+    try:
+        while True:
+            buttons = 0
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                    return protocol
+                if event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_SPACE:
+                        buttons |= BTN_DASH
+                    elif event.key == pygame.K_r:
+                        buttons |= BTN_RELOAD
+                    elif event.key == pygame.K_q:
+                        buttons |= BTN_PREV
+                    elif event.key == pygame.K_e:
+                        buttons |= BTN_NEXT
+            keys = pygame.key.get_pressed()
+            dx = (1 if keys[pygame.K_RIGHT] else 0) - (1 if keys[pygame.K_LEFT] else 0)
+            dy = (1 if keys[pygame.K_DOWN] else 0) - (1 if keys[pygame.K_UP] else 0)
+            if pygame.mouse.get_pressed()[0]:
+                buttons |= BTN_FIRE
+
+            predicted.command(dx, dy, camera.to_world(pygame.mouse.get_pos()), buttons)
+            protocol.send_commands(predicted.pending[-3:])
+            predicted.reconcile(protocol)
+            camera.follow(predicted.player.rect)
+            world.unload_far(predicted.player.rect.center)
+
+            win = game.win
+            world.draw(win, camera)
+            for net_id, (kind, x, y, health) in protocol.state.items():
+                if kind == KIND_BULLET:
+                    pygame.draw.circle(win, game.YELLOW, camera.apply((x, y)), max(1, round(4 * camera.zoom)))
+                    continue
+                if net_id == protocol.net_id:
+                    x, y = predicted.player.rect.center
+                image = surface_cache.scaled(images[kind], camera.zoom)
+                rect = image.get_rect(center=camera.apply((x, y)))
+                win.blit(image, rect)
+                health_color = game.GREEN if health > 60 else game.YELLOW if health > 30 else game.RED
+                pygame.draw.rect(win, health_color, (rect.x, rect.y - 10 * camera.zoom,
+                                                     int(40 * camera.zoom * health / 100), max(1, 5 * camera.zoom)))
+            if protocol.header:
+                _, _, health, weapon, ammo, score, kills = protocol.header
+                hud = font.render(f"HP {health}  {predicted.player.weapons[weapon].name}: {ammo}  "
+                                  f"SCORE {score}  KILLS {kills}", True, game.WHITE)
+                win.blit(hud, (20, 20))
+            pygame.display.flip()
+
+            next_tick += step
+            await asyncio.sleep(max(0, next_tick - loop.time()))
+    finally:
+        protocol.close()
+
+
+async def run_local(port, clients, seconds):
+    server = asyncio.create_task(run_server("127.0.0.1", port, seconds + 1))
+    await asyncio.sleep(0.2)
+    results = await asyncio.gather(*(run_headless_client("127.0.0.1", port, f"bot{i}", seconds)
+                                     for i in range(clients)))
+    world, protocol = await server
+    for result in results:
+        print(f"client {result.name}: {result.snapshots} snapshots, {len(result.state)} entities, "
+              f"{result.bytes_received / seconds / 1024:.1f} KiB/s")
+    print(f"server: tick {world.tick}, {len(world.zombies)} zombies, "
+          f"{protocol.bytes_sent / seconds / 1024:.1f} KiB/s sent")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ultimate Zombie Escape local co-op")
+    sub = parser.add_subparsers(dest="mode", required=True)
+    server = sub.add_parser("server")
+    server.add_argument("--host", default="0.0.0.0")
+    server.add_argument("--port", type=int, default=DEFAULT_PORT)
+    server.add_argument("--seed", type=int)
+    client = sub.add_parser("client")
+    client.add_argument("--host", default="127.0.0.1")
+    client.add_argument("--port", type=int, default=DEFAULT_PORT)
+    client.add_argument("--name", default="survivor")
+    client.add_argument("--headless", type=float, metavar="SECONDS")
+    local = sub.add_parser("local")
+    local.add_argument("--port", type=int, default=DEFAULT_PORT)
+    local.add_argument("--clients", type=int, default=2)
+    local.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args(argv)
+
+    import_game(headless=args.mode != "client" or args.headless is not None)
+    if args.mode == "server":
+        asyncio.run(run_server(args.host, args.port, seed=args.seed))
+    elif args.mode == "client" and args.headless is not None:
+        asyncio.run(run_headless_client(args.host, args.port, args.name, args.headless))
+    elif args.mode == "client":
+        asyncio.run(run_client(args.host, args.port, args.name))
+    else:
+        asyncio.run(run_local(args.port, args.clients, args.seconds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""Unattended soak tests for Ultimate Zombie Escape.
+
+Bots play back-to-back rounds headless while frame time and process memory
+are sampled, so slowdowns and leaks show up without anyone at the keyboard.
+
+    python soak.py --minutes 60
+    python soak.py --profiles hard --minutes 10 --report 30 --no-render
+"""
+import os
+import sys
+import time
+import random
+import argparse
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import game
+
+
+def rss_mb():
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError):
+        import resource
+        # ru_maxrss is the peak, in kilobytes on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (2 ** 20 if sys.platform == "darwin" else 2 ** 10)
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class SoakRun:
+    def __init__(self, profile, seed, render, diagnostics=None):
+        self.profile = profile
+        self.render = render
+        self.bot = game.BotController(profile, seed)
+        self.game = game.ZombieEscape(headless=not render, controller=self.bot, diagnostics=diagnostics)
+        self.game.username = f"BOT-{profile.upper()}"
+        self.game.begin_playing()
+        self.rounds = 0
+        self.victories = 0
+        self.kills = 0
+        self.frame_ms = []
+        self.game.events.subscribe(game.ZOMBIE_KILLED, self.on_kill)
+
+    def on_kill(self, event):
+        self.kills += 1
+
+    def frame(self):
+        zombie_escape = self.game
+        start = time.perf_counter()
+        zombie_escape.update()
+        zombie_escape.events.drain()
+        if self.render:
+            zombie_escape.draw()
+        self.frame_ms.append((time.perf_counter() - start) * 1000)
+        if zombie_escape.state in (game.GAME_OVER, game.VICTORY):
+            self.rounds += 1
+            self.victories += zombie_escape.state == game.VICTORY
+            zombie_escape.begin_playing()
+
+    def report(self):
+        frame_ms, self.frame_ms = self.frame_ms, []
+        average = sum(frame_ms) / max(1, len(frame_ms))
+        return (f"{self.profile:>7} {self.rounds:>6} {self.victories:>4} {self.kills:>7} "
+                f"{len(self.game.zombies):>6} {average:>7.2f} {percentile(frame_ms, 0.99):>7.2f} "
+                f"{max(frame_ms, default=0):>7.2f}")
+
+
+def growth_per_hour(samples):
+    # Least-squares slope of RSS over time, in MB per hour
+    if len(samples) < 2:
+        return 0.0
+    mean_t = sum(t for t, _ in samples) / len(samples)
+    mean_m = sum(m for _, m in samples) / len(samples)
+    variance = sum((t - mean_t) ** 2 for t, _ in samples)
+    if variance == 0:
+        return 0.0
+    slope = sum((t - mean_t) * (m - mean_m) for t, m in samples) / variance
+    return slope * 3600
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run bot players headless and watch frame time and memory")
+    parser.add_argument("--profiles", default=",".join(game.BOT_PROFILES),
+                        help="comma separated bot profiles, one game each")
+    parser.add_argument("--minutes", type=float, default=60)
+    parser.add_argument("--report", type=float, default=60, help="seconds between report lines")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-render", action="store_true", help="skip drawing frames")
+    parser.add_argument("--realtime", action="store_true", help="pace each game at the simulation rate")
+    parser.add_argument("--max-growth", type=float, default=50,
+                        help="fail when memory grows faster than this many MB per hour")
+    parser.add_argument("--diagnostics", metavar="DIR",
+                        help="track per-round object counts and allocations, dumping PROFILE.json into DIR")
+    args = parser.parse_args(argv)
+
+    random.seed(args.seed)
+    runs = []
+    for i, profile in enumerate(args.profiles.split(",")):
+        diagnostics = None
+        if args.diagnostics:
+            from diagnostics import Diagnostics
+            os.makedirs(args.diagnostics, exist_ok=True)
+            diagnostics = Diagnostics(os.path.join(args.diagnostics, f"{profile}.json"))
+        runs.append(SoakRun(profile, args.seed + i, not args.no_render, diagnostics))
+    start = time.perf_counter()
+    end = start + args.minutes * 60
+    next_report = start + args.report
+    baseline = rss_mb()
+    samples = []
+    print(f"{'profile':>7} {'rounds':>6} {'wins':>4} {'kills':>7} {'alive':>6} "
+          f"{'avg ms':>7} {'p99 ms':>7} {'max ms':>7}")
+    while True:
+        frame_start = time.perf_counter()
+        for run in runs:
+            run.frame()
+        now = time.perf_counter()
+        if args.realtime:
+            time.sleep(max(0, 1 / game.SIM_RATE - (now - frame_start)))
+        if now >= next_report or now >= end:
+            memory = rss_mb()
+            samples.append((now - start, memory))
+            for run in runs:
+                print(run.report())
+            print(f"-- {(now - start) / 60:.1f} min, rss {memory:.1f} MB "
+                  f"({memory - baseline:+.1f}), growth {growth_per_hour(samples):+.1f} MB/h")
+            next_report = now + args.report
+        if now >= end:
+            break
+
+    # The first samples include warm-up (asset caches, chunk cache filling), so judge the rest
+    growth = growth_per_hour(samples[len(samples) // 4:])
+    print(f"memory growth {growth:+.1f} MB/h (limit {args.max_growth:g})")
+    for run in runs:
+        if run.game.diagnostics:
+            run.game.diagnostics.dump(run.game.diagnostics.path, run.game)
+            for flag in run.game.diagnostics.flags:
+                print(f"{run.profile}: {flag}")
+    return 1 if growth > args.max_growth else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
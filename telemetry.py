@@ -0,0 +1,349 @@
+"""Gameplay telemetry for Ultimate Zombie Escape.
+
+TelemetryRecorder subscribes to the game's event bus and packs every event
+into a fixed-size binary record in a ring buffer. A background thread flushes
+the buffer to rotating gzip logs, so the game loop never touches the disk.
+
+    python game.py --telemetry logs/
+    python telemetry.py summarize logs/ [--json]
+"""
+import os
+import sys
+import glob
+import gzip
+import json
+import time
+import zlib
+import struct
+import argparse
+import threading
+
+# Event kinds, mirroring the event constants in game.py
+EVENT_NAMES = [
+    "zombie_hit",
+    "zombie_killed",
+    "player_hit",
+    "player_died",
+    "player_dashed",
+    "supply_collected",
+    "weapon_fired",
+    "weapon_reloaded",
+    "weapon_switched",
+    "round_won",
+    "round_started",
+    "game_paused",
+    "game_resumed",
+    "supply_spawned"
+]
+EVENT_CODES = {name: kind for kind, name in enumerate(EVENT_NAMES)}
+ZOMBIE_TYPES = ["normal", "fast", "tank", "boss"]
+SUPPLY_TYPES = ["normal", "health", "speed", "ammo", "score"]
+WEAPON_NAMES = ["Pistol", "Shotgun", "Rifle"]
+
+MAGIC = b"ZTEL"
+VERSION = 1
+FILE_HEADER = struct.Struct("<4sHH")
+# time_ms, tick, kind, detail (zombie/supply type code), x, y, value
+RECORD = struct.Struct("<IIHHiiI")
+
+DEFAULT_CAPACITY = 16384
+FLUSH_INTERVAL = 1.0
+ROTATE_BYTES = 8 * 1024 * 1024
+KEEP_FILES = 64
+READ_RECORDS = 65536
+
+
+def detail_code(data):
+    if isinstance(data, str):
+        return ZOMBIE_TYPES.index(data) + 1 if data in ZOMBIE_TYPES else 0
+    supply_type = getattr(data, "type", None)
+    return SUPPLY_TYPES.index(supply_type) + 1 if supply_type in SUPPLY_TYPES else 0
+
+
+def detail_name(kind, code):
+    if not code:
+        return None
+    if EVENT_NAMES[kind].startswith("supply"):
+        return SUPPLY_TYPES[code - 1]
+    return ZOMBIE_TYPES[code - 1]
+
+
+class TelemetryRecorder:
+    def __init__(self, directory, capacity=DEFAULT_CAPACITY, flush_interval=FLUSH_INTERVAL,
+                 rotate_bytes=ROTATE_BYTES, keep_files=KEEP_FILES):
+        self.directory = directory
+        self.capacity = capacity
+        self.buffer = bytearray(capacity * RECORD.size)
+        self.head = 0
+        self.tail = 0
+        self.dropped = 0
+        self.flush_interval = flush_interval
+        self.rotate_bytes = rotate_bytes
+        self.keep_files = keep_files
+        self.session = time.strftime("%Y%m%d-%H%M%S")
+        self.part = 0
+        self.file = None
+        self.file_bytes = 0
+        self.started = time.monotonic()
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.stopping = False
+        os.makedirs(directory, exist_ok=True)
+        self.thread = threading.Thread(target=self.run, name="telemetry-writer", daemon=True)
+        self.thread.start()
+
+    def attach(self, events):
+        for kind in range(len(events.subscribers)):
+            events.subscribe(kind, self.on_event)
+
+    def on_event(self, event):
+        self.record(event.kind, event.tick, event.x, event.y, event.value, detail_code(event.data))
+
+    def record(self, kind, tick, x, y, value=0, detail=0):
+        time_ms = int((time.monotonic() - self.started) * 1000)
+        with self.lock:
+            if self.head - self.tail >= self.capacity:
+                self.dropped += 1
+                return
+            RECORD.pack_into(self.buffer, (self.head % self.capacity) * RECORD.size,
+                             time_ms, tick, kind, detail, int(x), int(y), int(value) & 0xFFFFFFFF)
+            self.head += 1
+            # Wake the writer early when the ring is half full
+            if self.head - self.tail == self.capacity // 2:
+                self.wake.set()
+
+    def take(self):
+        with self.lock:
+            head, tail = self.head, self.tail
+            start = (tail % self.capacity) * RECORD.size
+            end = (head % self.capacity) * RECORD.size
+            if head == tail:
+                data = b""
+            elif start < end:
+                data = bytes(self.buffer[start:end])
+            else:
+                data = bytes(self.buffer[start:]) + bytes(self.buffer[:end])
+            self.tail = head
+        return data
+
+    def open_next(self):
+        if self.file:
+            self.file.close()
+        self.part += 1
+        path = os.path.join(self.directory, f"telemetry-{self.session}-{self.part:04d}.bin.gz")
+        self.file = gzip.open(path, "wb", compresslevel=5)
+        self.file.write(FILE_HEADER.pack(MAGIC, VERSION, RECORD.size))
+        self.file_bytes = 0
+        files = sorted(glob.glob(os.path.join(self.directory, "telemetry-*.bin.gz")))
+        for old in files[:max(0, len(files) - self.keep_files)]:
+            os.remove(old)
+
+    def write(self, data):
+        if not data:
+            return
+        if self.file is None or self.file_bytes >= self.rotate_bytes:
+            self.open_next()
+        self.file.write(data)
+        self.file_bytes += len(data)
+
+    def run(self):
+        while not self.stopping:
+            self.wake.wait(self.flush_interval)
+            self.wake.clear()
+            self.write(self.take())
+        self.write(self.take())
+        if self.file:
+            self.file.close()
+            self.file = None
+
+    def close(self):
+        if not self.stopping:
+            self.stopping = True
+            self.wake.set()
+            self.thread.join()
+
+
+def log_files(paths):
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, "telemetry-*.bin.gz"))))
+        else:
+            files.append(path)
+    return files
+
+
+def read_log(path, records):
+    with gzip.open(path, "rb") as log:
+        magic, version, size = FILE_HEADER.unpack(log.read(FILE_HEADER.size))
+        if magic != MAGIC or version != VERSION or size != RECORD.size:
+            raise ValueError(f"{path}: not a telemetry log (version {version})")
+        while True:
+            data = log.read(records * RECORD.size)
+            usable = len(data) - len(data) % RECORD.size
+            if usable:
+                yield data[:usable]
+            if len(data) < records * RECORD.size:
+                break
+
+
+def read_partial(path, records):
+    # A log cut off mid-write still holds complete records up to the break;
+    # decompress it piecewise so they can be recovered.
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    pending = b""
+    header = False
+    with open(path, "rb") as raw:
+        while True:
+            block = raw.read(1 << 16)
+            try:
+                pending += decompressor.decompress(block) if block else b""
+            except zlib.error:
+                block = b""
+            if not header and len(pending) >= FILE_HEADER.size:
+                magic, version, size = FILE_HEADER.unpack(pending[:FILE_HEADER.size])
+                if magic != MAGIC or version != VERSION or size != RECORD.size:
+                    return
+                pending = pending[FILE_HEADER.size:]
+                header = True
+            if header and (len(pending) >= records * RECORD.size or not block):
+                usable = len(pending) - len(pending) % RECORD.size
+                if usable:
+                    yield pending[:usable]
+                pending = pending[usable:]
+            if not block or decompressor.eof:
+                return
+
+
+def iter_chunks(paths, records=READ_RECORDS):
+    # Yields raw record bytes a chunk at a time, so memory stays bounded by the chunk size
+    for path in log_files(paths):
+        read = 0
+        try:
+            for chunk in read_log(path, records):
+                read += len(chunk)
+                yield chunk
+        except (EOFError, gzip.BadGzipFile, zlib.error, struct.error) as error:
+            # Crashed or still-open logs lack the gzip trailer; keep what is complete and move on
+            print(f"warning: {path}: {error}; using the complete records only", file=sys.stderr)
+            skip = read
+            for chunk in read_partial(path, records):
+                if skip >= len(chunk):
+                    skip -= len(chunk)
+                    continue
+                yield chunk[skip:]
+                skip = 0
+
+
+def iter_records(paths):
+    for chunk in iter_chunks(paths):
+        yield from RECORD.iter_unpack(chunk)
+
+
+class Summary:
+    def __init__(self, cell=500):
+        self.cell = cell
+        self.records = 0
+        self.events = {}
+        self.weapons = {}
+        self.kills = {}
+        self.supplies = {}
+        self.deaths = {}
+        self.rounds = 0
+        self.rounds_ended = 0
+        self.round_ticks = 0
+        self.pauses = 0
+        self.pause_ms = 0
+        self.longest_pause_ms = 0
+        self.pause_started = None
+
+    def end_pause(self, time_ms):
+        if self.pause_started is not None:
+            duration = max(0, time_ms - self.pause_started)
+            self.pauses += 1
+            self.pause_ms += duration
+            self.longest_pause_ms = max(self.longest_pause_ms, duration)
+            self.pause_started = None
+
+    def add(self, time_ms, tick, kind, detail, x, y, value):
+        self.records += 1
+        name = EVENT_NAMES[kind] if kind < len(EVENT_NAMES) else f"kind_{kind}"
+        self.events[name] = self.events.get(name, 0) + 1
+        if name == "weapon_fired":
+            weapon = WEAPON_NAMES[value] if value < len(WEAPON_NAMES) else str(value)
+            self.weapons[weapon] = self.weapons.get(weapon, 0) + 1
+        elif name == "zombie_killed":
+            zombie = detail_name(kind, detail)
+            self.kills[zombie] = self.kills.get(zombie, 0) + 1
+        elif name == "supply_collected":
+            supply = detail_name(kind, detail)
+            self.supplies[supply] = self.supplies.get(supply, 0) + 1
+        elif name == "player_died":
+            cell = (x // self.cell, y // self.cell)
+            self.deaths[cell] = self.deaths.get(cell, 0) + 1
+        elif name == "round_started":
+            self.end_pause(time_ms)
+            self.rounds += 1
+        elif name == "game_paused":
+            self.pause_started = time_ms
+        elif name == "game_resumed":
+            self.end_pause(time_ms)
+        if name in ("player_died", "round_won"):
+            self.rounds_ended += 1
+            self.round_ticks += tick
+
+    def report(self, top=10):
+        deaths = sorted(self.deaths.items(), key=lambda item: -item[1])[:top]
+        return {
+            "records": self.records,
+            "events": self.events,
+            "weapon_fires": self.weapons,
+            "kills_by_type": self.kills,
+            "supplies_collected": self.supplies,
+            "rounds": self.rounds,
+            "average_round_seconds": round(self.round_ticks / 60 / max(1, self.rounds_ended), 1),
+            "pauses": self.pauses,
+            "average_pause_seconds": round(self.pause_ms / 1000 / max(1, self.pauses), 1),
+            "longest_pause_seconds": round(self.longest_pause_ms / 1000, 1),
+            "death_hotspots": [{"x": cx * self.cell, "y": cy * self.cell, "size": self.cell, "deaths": count}
+                               for (cx, cy), count in deaths]
+        }
+
+
+def summarize(paths, cell=500):
+    summary = Summary(cell)
+    for record in iter_records(paths):
+        summary.add(*record)
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ultimate Zombie Escape telemetry tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    report = sub.add_parser("summarize", help="stream over telemetry logs and print aggregate stats")
+    report.add_argument("paths", nargs="+", help="log files or directories")
+    report.add_argument("--cell", type=int, default=500, help="death hotspot cell size in pixels")
+    report.add_argument("--top", type=int, default=10)
+    report.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    result = summarize(args.paths, args.cell).report(args.top)
+    if args.json:
+        json.dump(result, sys.stdout, indent=2)
+        print()
+        return
+    for key, value in result.items():
+        if isinstance(value, dict):
+            print(f"{key}:")
+            for name, count in sorted(value.items(), key=lambda item: -item[1]):
+                print(f"  {name}: {count}")
+        elif isinstance(value, list):
+            print(f"{key}:")
+            for hotspot in value:
+                print(f"  ({hotspot['x']}, {hotspot['y']}) {hotspot['deaths']} deaths")
+        else:
+            print(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()